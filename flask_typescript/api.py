@@ -6,7 +6,6 @@ from dataclasses import dataclass
 from dataclasses import MISSING
 from dataclasses import replace
 from functools import wraps
-from inspect import signature
 from types import NoneType
 from typing import Any
 from typing import Callable
@@ -41,6 +40,7 @@ from .types import JsonDict
 from .types import ModelType
 from .types import ModelTypeOrMissing
 from .types import Success
+from .typing import func_params
 from .typing import is_dataclass_type
 from .typing import TSBuilder
 from .typing import TSFunction
@@ -244,11 +244,7 @@ class Api:
         # and to deal with simple non-pydantic types (e.g. list[int])
         hints = self.get_type_hints(func)
 
-        defaults = {
-            k: v.default
-            for k, v in signature(func).parameters.items()
-            if v.default is not v.empty
-        }
+        _, defaults = func_params(func)
         cargs = {}
         has_file_storage = False
 
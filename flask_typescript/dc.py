@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import io
 from dataclasses import dataclass
+from typing import IO
 from typing import Literal
 
 from .typing import INDENT
@@ -21,39 +23,25 @@ TYPE = Literal[
 
 
 def dc_to_ts(self: DataColumn, prefix: str = "") -> str:
-    def _bool(name: str) -> str:
-        return f"{name}: {str(getattr(self,name)).lower()}"
-
-    def _attr(name: str) -> str:
-        val = getattr(self, name)
-        return f"{name}: {val}"
-
-    def _str(name: str) -> str:
-        return f'{name}: "{getattr(self,name)}"'
-
-    def to_ts() -> str:
-        name = _str("name")
-        typ = _str("type")
-        primary_key = _bool("primary_key")
-        multiple = _bool("multiple")
-        nullable = _bool("nullable")
-        default = _str("default") if self.default is not None else "default: null"
-        if self.maxlength > 0:
-            maxlength = _attr("maxlength")
-        else:
-            maxlength = None
-        values = "null" if self.values is None else repr(self.values)
-        values = f"values: {values}"
-
-        tab = prefix + INDENT
-        attr = [name, typ, nullable, primary_key, multiple, values, default, maxlength]
-        ret = f",{NL}{tab}".join(a for a in attr if a is not None)
-        return f"{{{NL}{tab}{ret}{NL}{prefix}}}"
-
-    return to_ts()
-
-
-@dataclass
+    tab = prefix + INDENT
+    values = "null" if self.values is None else repr(self.values)
+    default = "default: null" if self.default is None else f'default: "{self.default}"'
+    attr = [
+        f'name: "{self.name}"',
+        f'type: "{self.type}"',
+        f"nullable: {str(self.nullable).lower()}",
+        f"primary_key: {str(self.primary_key).lower()}",
+        f"multiple: {str(self.multiple).lower()}",
+        f"values: {values}",
+        default,
+    ]
+    if self.maxlength > 0:
+        attr.append(f"maxlength: {self.maxlength}")
+    ret = f",{NL}{tab}".join(attr)
+    return f"{{{NL}{tab}{ret}{NL}{prefix}}}"
+
+
+@dataclass(slots=True)
 class DataColumn:
     name: str
     type: TYPE = "text"
@@ -64,16 +52,6 @@ class DataColumn:
     default: str | None = None
     maxlength: int = -1
 
-    def _bool(self, name: str) -> str:
-        return f"{name}: {str(getattr(self,name)).lower()}"
-
-    def _attr(self, name: str) -> str:
-        val = getattr(self, name)
-        return f"{name}: {val}"
-
-    def _str(self, name: str) -> str:
-        return f'{name}: "{getattr(self,name)}"'
-
     def to_ts(self, prefix: str = "") -> str:
         return dc_to_ts(self, prefix)
 
@@ -82,10 +60,13 @@ class DataColumn:
 
 
 def metadata_to_ts(name: str, meta: dict[str, DataColumn]) -> str:
-    out = [f"export const {name} = {{"]
-    for k, v in meta.items():
-        s = f"{INDENT}{k}: {v.to_ts(INDENT)},"
-        out.append(s)
-    out.append("} satisfies Readonly<Record<string, DataColumn>>")
+    out = io.StringIO()
+    write_metadata_ts(name, meta, out)
+    return out.getvalue()[:-1]  # no final newline
+
 
-    return "\n".join(out)
+def write_metadata_ts(name: str, meta: dict[str, DataColumn], out: IO[str]) -> None:
+    out.write(f"export const {name} = {{{NL}")
+    for k, v in meta.items():
+        out.write(f"{INDENT}{k}: {v.to_ts(INDENT)},{NL}")
+    out.write(f"}} satisfies Readonly<Record<string, DataColumn>>{NL}")
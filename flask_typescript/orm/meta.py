@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 from typing import get_type_hints
 
@@ -100,6 +101,26 @@ def get_type_hints_sqla(
     include_extras: bool = False,
 ) -> dict[str, Any]:
     """add missing relationship values to type hints with @declared_attr"""
+    if globalns is None and localns is None:
+        # namespaces are dicts (unhashable) so only this case is memoized
+        return dict(_cached_type_hints_sqla(Cls, include_extras))
+    return _get_type_hints_sqla(Cls, globalns, localns, include_extras)
+
+
+@lru_cache(maxsize=256)
+def _cached_type_hints_sqla(
+    Cls: type[DeclarativeBase],
+    include_extras: bool,
+) -> dict[str, Any]:
+    return _get_type_hints_sqla(Cls, None, None, include_extras)
+
+
+def _get_type_hints_sqla(
+    Cls: type[DeclarativeBase],
+    globalns: dict[str, Any] | None,
+    localns: dict[str, Any] | None,
+    include_extras: bool,
+) -> dict[str, Any]:
     # Mapped[int] really just has m.__args__ == (int,) and m.__origin__ == Mapped
 
     def getargument(r: RelationshipProperty[Any]) -> Any:
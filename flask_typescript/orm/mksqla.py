@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import sys
+from collections import defaultdict
 from dataclasses import dataclass
 from dataclasses import replace
 from datetime import datetime
 from typing import Any
 from typing import IO
+from typing import TypeAlias
 
 import sqlalchemy as sqla
 from jinja2 import Template
@@ -53,6 +55,18 @@ from pydantic import BaseModel
 NS = {"+": "watson", "-": "crick", "class": "class_"}
 
 
+# module -> names imported from it
+Imports: TypeAlias = defaultdict[str, set[str]]
+
+# SQL type names to sqlalchemy class names
+INT_NAMES = {
+    "INTEGER": "Integer",
+    "BIGINT": "BigInteger",
+    "SMALLINT": "SmallInteger",
+    "TINYINT": "Boolean",
+}
+TEXT_NAMES = {"TEXT": "Text"}
+
 SQLA = "sqlalchemy"
 MYSQL = "sqlalchemy.dialects.mysql"
 POSTGRES = "sqlalchemy.dialects.postgresql"
@@ -66,7 +80,7 @@ def get_py_template() -> str:
     return read_text("flask_typescript.orm", "pydantic.py.jinja")
 
 
-@dataclass
+@dataclass(slots=True)
 class ColumnInfo:
     name: str
     column_name: str
@@ -132,11 +146,14 @@ class ModelMaker:
         table: Table,
         enums: dict[tuple[str, ...], str],
         sets: dict[tuple[str, ...], str],
-        pyimports: set[tuple[str, str]],
+        pyimports: Imports,
+        new_enums: list[tuple[str, ...]] | None = None,
+        new_sets: list[tuple[str, ...]] | None = None,
     ) -> TableInfo:
         columns: list[ColumnInfo] = []
 
-        indexes = table.indexes
+        # local copy: don't mutate the Table's own set of indexes
+        indexes = set(table.indexes)
         sqlatype: str
         charset: str | None
 
@@ -159,7 +176,7 @@ class ModelMaker:
                     if not self.aspydantic:
                         server_default = quote(server_default)
                         server_default = f"text({server_default})"
-                        pyimports.add((SQLA, "text"))
+                        pyimports[SQLA].add("text")
                     else:
                         if server_default == "NULL":
                             server_default = "None"
@@ -167,15 +184,15 @@ class ModelMaker:
             if isinstance(typ, (sqla.Double, sqla.DOUBLE_PRECISION, mysql.DOUBLE)):
                 pytype = "float"
                 sqlatype = "Double"
-                pyimports.add((SQLA, sqlatype))
+                pyimports[SQLA].add(sqlatype)
             elif isinstance(typ, (sqla.Boolean, sqla.BOOLEAN)):
                 sqlatype = "Boolean"
                 pytype = "bool"
-                pyimports.add((SQLA, sqlatype))
+                pyimports[SQLA].add(sqlatype)
             elif isinstance(typ, (sqla.Float, sqla.REAL)):
                 sqlatype = "Float"
                 pytype = "float"
-                pyimports.add((SQLA, sqlatype))
+                pyimports[SQLA].add(sqlatype)
             elif isinstance(
                 typ,
                 (
@@ -186,53 +203,50 @@ class ModelMaker:
                     mysql.TINYINT,
                 ),
             ):
-                if name == "INTEGER":
-                    name = "Integer"
-                elif name == "BIGINT":
-                    name = "BigInteger"
-                elif name == "SMALLINT":
-                    name = "SmallInteger"
-                elif name == "TINYINT":
-                    name = "Boolean"
+                name = INT_NAMES.get(name, name)
                 pytype = "int"
                 sqlatype = name
-                pyimports.add((SQLA, name))
+                pyimports[SQLA].add(name)
             elif isinstance(typ, sqla.DECIMAL):
                 sqlatype = f"DECIMAL({typ.precision},{typ.scale})"
                 pytype = "Decimal"
-                pyimports.add((SQLA, "DECIMAL"))
-                pyimports.add(("decimal", "Decimal"))
+                pyimports[SQLA].add("DECIMAL")
+                pyimports["decimal"].add("Decimal")
             elif isinstance(typ, sqla.TIMESTAMP):
                 pytype = "datetime"
-                pyimports.add((SQLA, name))
-                pyimports.add(("datetime", "datetime"))
+                pyimports[SQLA].add(name)
+                pyimports["datetime"].add("datetime")
             elif isinstance(typ, sqla.DateTime):
                 pytype = "datetime"
-                pyimports.add((SQLA, name))
-                pyimports.add(("datetime", "datetime"))
+                pyimports[SQLA].add(name)
+                pyimports["datetime"].add("datetime")
             elif isinstance(typ, sqla.Date):
                 pytype = "date"
-                pyimports.add((SQLA, name))
-                pyimports.add(("datetime", "date"))
+                pyimports[SQLA].add(name)
+                pyimports["datetime"].add("date")
             elif isinstance(typ, mysql.SET):
                 s = tuple(typ.values)
                 if s not in sets:
                     sets[s] = self.get_set_name(c, sets)
+                    if new_sets is not None:
+                        new_sets.append(s)
                 sqlatype = sets[s]
                 literal = f"{sqlatype}_Literal"
                 pytype = f"set[{literal}]"
-                pyimports.add((MYSQL, "SET"))
-                pyimports.add(("typing", "Literal"))
-                pyimports.add(("typing", "get_args"))
+                pyimports[MYSQL].add("SET")
+                pyimports["typing"].add("Literal")
+                pyimports["typing"].add("get_args")
             elif isinstance(typ, sqla.Enum):
                 s = tuple(typ.enums)
                 if s not in enums:
                     enums[s] = self.get_enum_name(c, enums)
+                    if new_enums is not None:
+                        new_enums.append(s)
                 sqlatype = enums[s]
                 pytype = sqlatype
                 sqlatype = f"Enum({sqlatype})"
-                pyimports.add((SQLA, "Enum"))
-                pyimports.add(("enum", "Enum as PyEnum"))
+                pyimports[SQLA].add("Enum")
+                pyimports["enum"].add("Enum as PyEnum")
             elif isinstance(
                 typ,
                 (
@@ -252,45 +266,45 @@ class ModelMaker:
                     else:
                         sqlatype = name
                 else:
-                    if name == "TEXT" and not usecharset:
-                        name = "Text"
+                    if not usecharset:
+                        name = TEXT_NAMES.get(name, name)
                     sqlatype = name
                 if name.startswith(("TINY", "LONG", "MEDIUM")) or name == "TEXT":
-                    pyimports.add((MYSQL, name))
+                    pyimports[MYSQL].add(name)
                 else:
-                    pyimports.add((SQLA, name))
+                    pyimports[SQLA].add(name)
 
             elif isinstance(typ, (sqla.String, sqla.CHAR)):
                 pytype = "str"
                 if hasattr(typ, "charset") and typ.charset and typ.charset != charset:
                     sqlatype = f'{name}({typ.length}, charset="{typ.charset}")'
-                    pyimports.add((MYSQL, name))
+                    pyimports[MYSQL].add(name)
                 else:
                     if name == "VARCHAR":
                         name = "String"
                     sqlatype = f"{name}({typ.length})"
-                    pyimports.add((SQLA, name))
+                    pyimports[SQLA].add(name)
             elif isinstance(typ, (sqla.BLOB, mysql.LONGBLOB, mysql.MEDIUMBLOB)):
                 pytype = "bytes"
                 if name == "BLOB":
-                    pyimports.add((SQLA, name))
+                    pyimports[SQLA].add(name)
                 else:
-                    pyimports.add((MYSQL, name))
+                    pyimports[MYSQL].add(name)
             elif isinstance(typ, (sqla.BINARY, _Binary)):
                 sqlatype = f"{name}({typ.length})"
                 pytype = "bytes"
-                pyimports.add((SQLA, name))
+                pyimports[SQLA].add(name)
             elif isinstance(typ, (sqla.JSON, postgresql.JSONB)):
                 pytype = "Any"
                 if name == "JSON":
-                    pyimports.add((SQLA, name))
+                    pyimports[SQLA].add(name)
                 else:
-                    pyimports.add((POSTGRES, name))
-                pyimports.add(("typing", "Any"))
+                    pyimports[POSTGRES].add(name)
+                pyimports["typing"].add("Any")
             elif isinstance(typ, mysql.YEAR):
                 sqlatype = f"{name}(4)"
                 pytype = "int"
-                pyimports.add((MYSQL, name))
+                pyimports[MYSQL].add(name)
             elif isinstance(typ, sqla.ARRAY):
                 item_type = typ.item_type.__class__.__name__
                 dimensions = typ.dimensions or 1
@@ -300,21 +314,21 @@ class ModelMaker:
                 pytype = f"list[{py_item_type}]"
                 for _ in range(1, dimensions):
                     pytype = f"list[{pytype}]"
-                pyimports.add((SQLA, "ARRAY"))
-                pyimports.add((SQLA, item_type))
+                pyimports[SQLA].add("ARRAY")
+                pyimports[SQLA].add(item_type)
             elif isinstance(typ, postgresql.BYTEA):
                 if typ.length:
                     sqlatype = f"{sqlatype}(length={typ.length})"
                 pytype = "bytes"
-                pyimports.add((POSTGRES, name))
+                pyimports[POSTGRES].add(name)
             elif isinstance(typ, postgresql.HSTORE):
                 pytype = "dict[str,str]"
-                pyimports.add((POSTGRES, name))
+                pyimports[POSTGRES].add(name)
             elif isinstance(typ, (mysql.BIT, postgresql.BIT)):
                 if typ.length:
                     sqlatype = f"{sqlatype}(length={typ.length})"
                 pytype = "bytes"
-                pyimports.add((typ.__module__, name))
+                pyimports[typ.__module__].add(name)
 
             else:
                 sqlatype, pytype = self.other(c, pyimports)
@@ -324,6 +338,16 @@ class ModelMaker:
 
             max_length = c.type.length if hasattr(c.type, "length") else None
 
+            index = c.index
+            unique = c.unique or False
+            # resolve single column indexes before building the ColumnInfo
+            for i in indexes:
+                if len(i.columns) == 1:
+                    if c.name in i.columns:
+                        index, unique = True, i.unique
+                        indexes.discard(i)
+                        break
+
             d = ColumnInfo(
                 name=c.name,
                 type=sqlatype,
@@ -331,23 +355,16 @@ class ModelMaker:
                 nullable=c.nullable or False,
                 pk=c.primary_key,
                 server_default=server_default,
-                index=c.index,
-                unique=c.unique or False,
+                index=index,
+                unique=unique,
                 column_name=self.column_name(c.name),
                 max_length=max_length,
             )
-
-            for i in indexes:
-                if len(i.columns) == 1:
-                    if c.name in i.columns:
-                        d = replace(d, index=True, unique=i.unique)
-                        indexes.remove(i)
-                        break
             d = self.fixup_column(d, pyimports)
             columns.append(d)
 
         if indexes:
-            pyimports.add((SQLA, "Index"))
+            pyimports[SQLA].add("Index")
 
         return TableInfo(
             model=self.toclassname(table.name),
@@ -360,12 +377,12 @@ class ModelMaker:
     def fixup_column(
         self,
         col: ColumnInfo,
-        pyimports: set[tuple[str, str]],
+        pyimports: Imports,
     ) -> ColumnInfo:
         if not self.aspydantic:
             return col
         if col.column_name == "schema":
-            pyimports.add(("pydantic", "Field"))
+            pyimports["pydantic"].add("Field")
             return replace(col, column_name=col.column_name + "_")
         return col
 
@@ -382,7 +399,7 @@ class ModelMaker:
     def other(
         self,
         col: Column[Any],
-        pyimports: set[tuple[str, str]],
+        pyimports: Imports,
     ) -> tuple[str, str]:
         if self.throw:
             raise RuntimeError(
@@ -393,8 +410,8 @@ class ModelMaker:
         module = col.type.__class__.__module__
         sqlatype = name
         pytype = "Any"
-        pyimports.add(("typing", "Any"))
-        pyimports.add((module, name))
+        pyimports["typing"].add("Any")
+        pyimports[module].add(name)
         return sqlatype, pytype
 
     def unique_name(self, name: str, names: set[str]) -> str:
@@ -432,25 +449,41 @@ class ModelMaker:
         tables: list[Table],
         out: IO[str] = sys.stdout,
     ) -> None:
-        pyimports: set[tuple[str, str]] = {
-            ("sqlalchemy.orm", "Mapped"),
-            ("sqlalchemy.orm", "mapped_column"),
-        }
-        ret: list[str] = []
+        pyimports: Imports = defaultdict(set)
+        pyimports["sqlalchemy.orm"].update(["Mapped", "mapped_column"])
         sets: dict[tuple[str, ...], str] = {}
         enums: dict[tuple[str, ...], str] = {}
+        # first pass: convert all tables so that we know
+        # all the imports required for the preamble
+        converted = []
         for table in tables:
-            tsets = sets.copy()
-            tenums = enums.copy()
-            data = self.convert_table(table, enums, sets, pyimports)
+            # enums and sets first seen in this table
+            new_enums: list[tuple[str, ...]] = []
+            new_sets: list[tuple[str, ...]] = []
+            data = self.convert_table(
+                table,
+                enums,
+                sets,
+                pyimports,
+                new_enums=new_enums,
+                new_sets=new_sets,
+            )
+            converted.append((table, data, new_enums, new_sets))
+
+        if sets:
+            pyimports["typing"].add("TypeAlias")
 
-            xenums = [
-                (enums[k], [(v, self.pyname(v)) for v in k])
-                for k in set(enums.keys()) - set(tenums.keys())
-            ]
-            xsets = [(sets[k], k) for k in set(sets.keys()) - set(tsets.keys())]
+        self.print_preamble(
+            pyimports,
+            out=out,
+            base=self.base,
+        )
+        # second pass: stream each model straight to `out`
+        for table, data, new_enums, new_sets in converted:
+            xenums = [(enums[k], [(v, self.pyname(v)) for v in k]) for k in new_enums]
+            xsets = [(sets[k], k) for k in new_sets]
 
-            txt = self.template.render(
+            self.template.stream(
                 sets=xsets,
                 enums=xenums,
                 base=self.base,
@@ -458,18 +491,8 @@ class ModelMaker:
                 schema=table.schema,
                 with_tablename=self.with_tablename,
                 table=data,
-            )
-
-            ret.append(txt)
-        if sets:
-            pyimports.add(("typing", "TypeAlias"))
-
-        self.print_tables(
-            ret,
-            pyimports,
-            out=out,
-            base=self.base,
-        )
+            ).dump(out)
+            print(file=out)
 
     # def render_table(self, **data: Any) -> str:
     #     return self.template.render(**data)
@@ -477,31 +500,30 @@ class ModelMaker:
     def get_preamble(self) -> Template:
         return PY_PREAMBLE if self.aspydantic else PREAMBLE
 
-    def print_tables(
+    def print_preamble(
         self,
-        models: list[str],
-        pyimports: set[tuple[str, str]],
+        pyimports: Imports,
         out: IO[str] = sys.stdout,
         base: str = "Base",
     ) -> None:
-        def key(p: tuple[str, str]) -> tuple[str, str]:
-            if p[0] in {"datetime", "enum", "typing"}:
-                return "aaaa" + p[0], p[1]
-            return p
-
-        preamble = self.get_preamble()
-        print(f"# generated by flask_typescript on {datetime.now()}", file=out)
-        print(
-            preamble.render(
-                base=base,
-                pyimports=sorted(pyimports, key=key),
-                abstract=self.abstract,
-            ),
-            file=out,
+        def key(mod: str) -> str:
+            if mod in {"datetime", "enum", "typing"}:
+                return "aaaa" + mod
+            return mod
+
+        # sort modules then names within each module
+        imports = [
+            (mod, name)
+            for mod in sorted(pyimports, key=key)
+            for name in sorted(pyimports[mod])
+        ]
+        preamble = self.get_preamble().render(
+            base=base,
+            pyimports=imports,
+            abstract=self.abstract,
         )
-        for model in models:
-            # print(file=out)
-            print(model, file=out)
+        print(f"# generated by flask_typescript on {datetime.now()}", file=out)
+        print(preamble, file=out)
 
     def mkcopy(
         self,
@@ -512,24 +534,21 @@ class ModelMaker:
     ) -> Table:
         indexes = table.indexes
         names = {c.key for c in table.c}
-        pks = list(table.primary_key.columns)
-        cols = [c.copy() for c in table.c if c not in pks]
-        pks = [c.copy() for c in pks]
+        pkcols = set(table.primary_key.columns)
+        pks = [c.copy() for c in table.primary_key.columns]
+        cols = [c.copy() for c in table.c if c not in pkcols]
         for pk in pks:
             pk.primary_key = False
 
-        if pkname in names:
-            while pkname in names:
-                pkname = pkname + "_"
+        while pkname in names:
+            pkname = pkname + "_"
 
         args: list[Column[Any] | Index] = pks + cols  # type: ignore
-        i = Index("fk_index", *(p.name for p in pks), unique=False)
-        args.append(i)
-        if indexes:
-            for i in indexes:
-                args.append(
-                    Index(i.name, *(c.name for c in i.columns), unique=i.unique),
-                )
+        args.append(Index("fk_index", *(p.name for p in pks), unique=False))
+        args.extend(
+            Index(i.name, *(c.name for c in i.columns), unique=i.unique)
+            for i in indexes
+        )
 
         return Table(
             name,
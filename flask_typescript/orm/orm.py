@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import atexit
+import hashlib
+import io
+import os
+import pickle
 from collections.abc import Iterable
 from dataclasses import MISSING
+from functools import lru_cache
+from pathlib import Path
+from tempfile import NamedTemporaryFile
 from typing import Any
+from typing import Callable
 from typing import cast
 from typing import IO
 from typing import Iterator
@@ -10,11 +19,13 @@ from typing import Sequence
 from typing import TYPE_CHECKING
 
 import click
+from sqlalchemy import __version__ as sqla_version
 from sqlalchemy import Column
 from sqlalchemy import create_engine
 from sqlalchemy import Date
 from sqlalchemy import DateTime
 from sqlalchemy import Enum
+from sqlalchemy import Float
 from sqlalchemy import Integer
 from sqlalchemy import JSON
 from sqlalchemy import LargeBinary
@@ -25,26 +36,30 @@ from sqlalchemy import Table
 from sqlalchemy import Text
 from sqlalchemy import TIMESTAMP
 from sqlalchemy.dialects.mysql import SET
-from sqlalchemy.exc import ArgumentError
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.orm import DeclarativeMeta
 from sqlalchemy.sql.sqltypes import _Binary
 
 from ..dc import DataColumn
-from ..dc import metadata_to_ts
+from ..dc import write_metadata_ts
 from ..typing import Annotation
 from ..typing import INDENT
 from ..typing import TSBuilder
 from ..typing import TSInterface
 from ..typing import TSTypeable
-from ..utils import lenient_issubclass
 from .meta import Base
 from .meta import DCBase
+from .meta import DCMeta
 from .meta import get_type_hints_sqla
+from .meta import Meta
+from .meta import PYBase
 from .utils import chop
 from .utils import jsname
 
 if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection
+    from sqlalchemy.engine import Engine
     from sqlalchemy.engine.url import URL
 
 
@@ -63,7 +78,12 @@ MAP = {
 
 
 def is_model(v: Any) -> bool:
-    return lenient_issubclass(v, DeclarativeBase) and hasattr(
+    # most module attributes aren't classes at all so bail early
+    if not isinstance(v, type):
+        return False
+    # hasattr and not `in v.__dict__`: single table inheritance
+    # subclasses inherit their __table__
+    return issubclass(v, DeclarativeBase) and hasattr(
         v,
         "__table__",
     )  # or isinstance(v, DeclarativeMeta)
@@ -98,8 +118,88 @@ def get_default(c: Column[Any]) -> Any:
     return default
 
 
-def model_metadata(model: type[DeclarativeBase]) -> dict[str, DataColumn]:
-    table: Table = cast(Table, model.__table__)
+def _dc_set(typ: Any, d: dict[str, Any]) -> DataColumn:
+    return DataColumn(values=list(typ.values), multiple=True, type="text", **d)
+
+
+def _dc_enum(typ: Any, d: dict[str, Any]) -> DataColumn:
+    return DataColumn(values=list(typ.enums), type="text", **d)
+
+
+def _dc_string(typ: Any, d: dict[str, Any]) -> DataColumn:
+    return DataColumn(maxlength=typ.length or 0, type="text", **d)
+
+
+def _dc_integer(typ: Any, d: dict[str, Any]) -> DataColumn:
+    return DataColumn(type="integer", **d)
+
+
+def _dc_float(typ: Any, d: dict[str, Any]) -> DataColumn:
+    return DataColumn(type="float", **d)
+
+
+def _dc_binary(typ: Any, d: dict[str, Any]) -> DataColumn:
+    return DataColumn(type="binary", maxlength=typ.length or -1, **d)
+
+
+def _dc_date(typ: Any, d: dict[str, Any]) -> DataColumn:
+    return DataColumn(type="date", **d)
+
+
+def _dc_timestamp(typ: Any, d: dict[str, Any]) -> DataColumn:
+    return DataColumn(type="timestamp", **d)
+
+
+def _dc_datetime(typ: Any, d: dict[str, Any]) -> DataColumn:
+    return DataColumn(type="datetime", **d)
+
+
+def _dc_json(typ: Any, d: dict[str, Any]) -> DataColumn:
+    return DataColumn(type="json", **d)
+
+
+def _dc_any(typ: Any, d: dict[str, Any]) -> DataColumn:
+    return DataColumn(type="any", **d)
+
+
+DCHandler = Callable[[Any, dict[str, Any]], DataColumn]
+
+# column type class -> DataColumn constructor, checked in order with
+# issubclass so the first match wins e.g. Enum before String
+_DC_HANDLERS: tuple[tuple[type[Any] | tuple[type[Any], ...], DCHandler], ...] = (
+    (SET, _dc_set),
+    (Enum, _dc_enum),
+    ((String, Text), _dc_string),
+    (Integer, _dc_integer),
+    ((Numeric, Float), _dc_float),  # Float is not a Numeric in sqlalchemy 2.1
+    ((LargeBinary, _Binary), _dc_binary),
+    (Date, _dc_date),
+    (TIMESTAMP, _dc_timestamp),
+    (DateTime, _dc_datetime),
+    (JSON, _dc_json),
+)
+
+# memo of looked up column type classes: only the exact class is stored
+# so it can't change the answer for any other class
+_DC_CACHE: dict[type[Any], DCHandler] = {}
+
+
+def dc_handler(cls: type[Any]) -> DCHandler:
+    handler = _DC_CACHE.get(cls)
+    if handler is None:
+        handler = next(
+            (h for base, h in _DC_HANDLERS if issubclass(cls, base)),
+            _dc_any,
+        )
+        _DC_CACHE[cls] = handler
+    return handler
+
+
+def model_metadata(
+    model: type[DeclarativeBase] | Table,
+) -> dict[str, DataColumn]:
+    """DataColumn metadata for a mapped class or a plain Table"""
+    table = model if isinstance(model, Table) else cast(Table, model.__table__)
     columns = table.columns
     ret = {}
     for c in columns.values():
@@ -113,67 +213,149 @@ def model_metadata(model: type[DeclarativeBase]) -> dict[str, DataColumn]:
             "nullable": c.nullable,
             "default": default,
         }
-        if isinstance(typ, SET):
-            ret[name] = DataColumn(
-                values=list(typ.values),
-                multiple=True,
-                type="text",
-                **d,
-            )
-
-        elif isinstance(typ, Enum):  # before String
-            ret[name] = DataColumn(values=list(typ.enums), type="text", **d)
-        elif isinstance(typ, (String, Text)):
-            ret[name] = DataColumn(maxlength=typ.length or 0, type="text", **d)
-        elif isinstance(typ, Integer):
-            ret[name] = DataColumn(type="integer", **d)
-        elif isinstance(typ, Numeric):
-            ret[name] = DataColumn(type="float", **d)
-        elif isinstance(typ, (LargeBinary, _Binary)):
-            ret[name] = DataColumn(type="binary", maxlength=typ.length or -1, **d)
-        elif isinstance(typ, Date):
-            ret[name] = DataColumn(type="date", **d)
-        elif isinstance(typ, TIMESTAMP):
-            ret[name] = DataColumn(type="timestamp", **d)
-        elif isinstance(typ, DateTime):
-            ret[name] = DataColumn(type="datetime", **d)
-        elif isinstance(typ, JSON):
-            ret[name] = DataColumn(type="json", **d)
-        else:
-            ret[name] = DataColumn(type="any", **d)
+        ret[name] = dc_handler(type(typ))(typ, d)
     return ret
 
 
+@lru_cache(maxsize=1024)
+def enum_literal(values: tuple[str, ...], multiple: bool) -> str:
+    ttype = " | ".join(f'"{v}"' for v in values)
+    if multiple:
+        ttype = f"({ttype})[]"
+    return ttype
+
+
 def model_to_ts(name: str, meta: dict[str, DataColumn]) -> str:
-    out = [f"export type {name}Type = {{"]
+    out = io.StringIO()
+    write_model_ts(name, meta, out)
+    return out.getvalue()[:-1]  # no final newline
+
+
+def write_model_ts(name: str, meta: dict[str, DataColumn], out: IO[str]) -> None:
+    out.write(f"export type {name}Type = {{\n")
     for k, v in meta.items():
-        ttype = MAP[v.type]
         if v.values:
-            ttype = " | ".join(f'"{v}"' for v in v.values)
-            if v.multiple:
-                ttype = f"({ttype})[]"
-        s = f"{INDENT}{k}: {ttype}"
-        out.append(s)
-    out.append("}")
-
-    return "\n".join(out)
+            ttype = enum_literal(tuple(v.values), v.multiple)
+        else:
+            ttype = MAP[v.type]
+        out.write(f"{INDENT}{k}: {ttype}\n")
+    out.write("}\n")
 
 
-def datacolumn(out: IO[str]) -> None:
+@lru_cache(maxsize=1)
+def datacolumn_ts() -> str:
     builder = TSBuilder(ignore_defaults=True)
     b = builder(DataColumn).to_ts()
-    b = b.replace("maxlength:", "maxlength?:")  # HACK!
-    print(b, file=out)
+    return b.replace("maxlength:", "maxlength?:")  # HACK!
 
 
-def get_tables(url: str | URL, *tables: str) -> list[Table]:
-    engine = create_engine(url)
+def datacolumn(out: IO[str]) -> None:
+    print(datacolumn_ts(), file=out)
+
+
+def get_tables(
+    url: str | URL,
+    *tables: str,
+    cache_dir: str | None = None,
+    refresh: bool = False,
+) -> list[Table]:
+    meta = get_metadata(url, *tables, cache_dir=cache_dir, refresh=refresh)
+    return list(meta.tables.values())
+
+
+def reflect_metadata(
+    conn: Connection,
+    *tables: str,
+    schema: str | None = None,
+) -> MetaData:
+    """Reflect tables from the database.
+
+    With sqlalchemy 2.0 `MetaData.reflect` fetches columns, keys and
+    indexes for all the tables in bulk (`Inspector.get_multi_*`)
+    rather than table by table.
+    """
     meta = MetaData()
     if not tables:
-        meta.reflect(bind=engine)
+        meta.reflect(bind=conn, schema=schema)
     else:
-        meta.reflect(bind=engine, only=list(tables))
-    return list(meta.tables.values())
+        meta.reflect(bind=conn, only=list(tables), schema=schema)
+    return meta
+
+
+def cache_path(
+    cache_dir: str,
+    url: str | URL,
+    tables: Sequence[str],
+    schema: str | None = None,
+) -> Path:
+    key = repr(
+        (
+            make_url(url).render_as_string(hide_password=False),
+            schema,
+            sorted(tables),
+            sqla_version,
+        ),
+    )
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return Path(cache_dir).expanduser() / f"{digest}.pickle"
+
+
+@lru_cache(maxsize=None)
+def get_engine(url: str | URL) -> Engine:
+    """One engine (and connection pool) per database url
+
+    Not size limited: an evicted engine would keep its pool open
+    (referenced by the atexit hook) until the process exits anyway.
+    """
+    engine = create_engine(url)
+    atexit.register(engine.dispose)
+    return engine
+
+
+def get_metadata(
+    url: str | URL,
+    *tables: str,
+    schema: str | None = None,
+    cache_dir: str | None = None,
+    refresh: bool = False,
+) -> MetaData:
+    """Reflect tables from the database at `url`.
+
+    If `cache_dir` is given the reflected MetaData is pickled there
+    and reused on subsequent calls without connecting to the database
+    (unless `refresh` is True).
+    """
+    path = None
+    if cache_dir is not None:
+        path = cache_path(cache_dir, url, tables, schema)
+        if not refresh and path.exists():
+            try:
+                with path.open("rb") as fp:
+                    return cast(MetaData, pickle.load(fp))
+            except (pickle.UnpicklingError, EOFError):
+                pass  # a corrupt cache file is just a miss
+
+    with get_engine(url).connect() as conn:
+        meta = reflect_metadata(conn, *tables, schema=schema)
+
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file and rename so an interrupted
+        # dump never leaves a truncated pickle behind
+        with NamedTemporaryFile(
+            "wb",
+            dir=path.parent,
+            suffix=".tmp",
+            delete=False,
+        ) as tmp:
+            try:
+                pickle.dump(meta, tmp)
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+        os.replace(tmp.name, path)
+    return meta
 
 
 def dodatabase(
@@ -181,11 +363,13 @@ def dodatabase(
     *tables: str,
     preamble: bool = True,
     out: IO[str],
+    cache_dir: str | None = None,
+    refresh: bool = False,
 ) -> None:
     if preamble:
         datacolumn(out)
 
-    table_ts(out, get_tables(url, *tables))
+    table_ts(out, get_tables(url, *tables, cache_dir=cache_dir, refresh=refresh))
 
 
 def table_ts(
@@ -196,20 +380,18 @@ def table_ts(
 ) -> None:
     for table in tables:
         name = table.name.title()
-        try:
-
-            class M(Base):
-                __clsname__ = name
-                __table__ = table
-
-        except ArgumentError as e:
-            # no primary key maybe ...
-            print(f"// Error for {table.name}: {e}", file=out)
+        # we only need the columns so there is no need to
+        # map a class but keep the ORM's primary key requirement
+        if not table.primary_key.columns:
+            print(
+                f"// Error for {table.name}: no primary key for table '{table.name}'",
+                file=out,
+            )
             continue
-        m = model_metadata(M)
+        m = model_metadata(table)
         if not metadata_only:
-            print(model_to_ts(name, m), file=out)
-        print(metadata_to_ts(name, m), file=out)
+            write_model_ts(name, m, out)
+        write_metadata_ts(name, m, out)
 
 
 def get_annotations(cls: type[DeclarativeBase]) -> dict[str, Annotation]:
@@ -226,8 +408,18 @@ class ModelBuilder(TSBuilder):
         return super().get_annotations(cls)
 
 
-def model_ts(*Models: type[DeclarativeBase], out: IO[str]) -> None:
-    builder = ModelBuilder()
+def model_ts(
+    *Models: type[DeclarativeBase],
+    out: IO[str],
+    builder: ModelBuilder | None = None,
+) -> None:
+    """Print typescript for Models.
+
+    Pass the same `builder` for multiple calls so that types
+    already output are not output again.
+    """
+    if builder is None:
+        builder = ModelBuilder()
     # seen = set()
     for Model in Models:
         v = builder(Model)
@@ -248,6 +440,20 @@ def model_ts(*Models: type[DeclarativeBase], out: IO[str]) -> None:
             print(f"// {e}", file=out)
 
 
+# base classes that find_models should never report
+EXCLUDE = frozenset(
+    {
+        Base,
+        DCBase,
+        PYBase,
+        DeclarativeBase,
+        Meta,
+        DCMeta,
+        DeclarativeMeta,
+    },
+)
+
+
 def find_all_models(*modules: str) -> Iterator[list[type[DeclarativeBase]]]:
     for mod1 in modules:
         if ":" in mod1:
@@ -262,17 +468,7 @@ def find_models(
     mapped: str | None = None,
 ) -> Iterator[type[DeclarativeBase]]:
     from importlib import import_module
-    from .meta import PYBase, Meta, DCMeta
 
-    exclude = {
-        Base,
-        DCBase,
-        PYBase,
-        DeclarativeBase,
-        Meta,
-        DCMeta,
-        DeclarativeMeta,
-    }
     try:
         m = import_module(module)
     except ModuleNotFoundError as e:
@@ -297,7 +493,7 @@ def find_models(
         a = m.__dict__.values()
     for v in a:
         if is_model(v):
-            if v in exclude:
+            if v in EXCLUDE:
                 continue
             yield v
 
@@ -317,4 +513,4 @@ def model_meta_ts(*Models: type[DCBase], preamble: bool = True, out: IO[str]) ->
         else:
             m = model_metadata(Model)
 
-        print(metadata_to_ts(name, m), file=out)
+        write_metadata_ts(name, m, out)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from collections.abc import Sequence
+from functools import lru_cache
 from typing import Any
 from typing import get_args
 from typing import get_type_hints
 from typing import IO
+from typing import Iterator
 
 from jinja2 import Template
 from sqlalchemy import ColumnDefault
@@ -23,6 +25,7 @@ class {{name}}(pydantic.BaseModel):
 )
 
 
+@lru_cache(maxsize=1024)
 def tos(a: Any) -> str:
     if a.__module__ in {"builtins"}:
         if a.__name__ in {"list", "set"}:
@@ -37,28 +40,40 @@ def tos(a: Any) -> str:
     return f"{a.__module__}.{a.__name__}"
 
 
-def gettypes(dc: type[DeclarativeBase]) -> set[str]:
-    def g(args: Any) -> Any:
-        istype = isinstance(args, type)
-        if istype and args.__module__ not in {"builtins"}:
-            yield args.__module__
-            return
+def typemodules(args: Any) -> Iterator[str]:
+    """modules required to import the type `args`"""
+    istype = isinstance(args, type)
+    if istype and args.__module__ not in {"builtins"}:
+        yield args.__module__
+        return
 
-        if hasattr(args, "__module__") and args.__module__ in {"typing"}:
-            yield args.__module__
+    if getattr(args, "__module__", None) == "typing":
+        yield "typing"
 
-        for a in get_args(args):
-            yield from g(a)
+    for a in get_args(args):
+        yield from typemodules(a)
 
+
+def gettypes(
+    dc: type[DeclarativeBase],
+    hints: dict[str, Any] | None = None,
+) -> set[str]:
+    if hints is None:
+        hints = get_type_hints(dc)
     s: set[Any] = set()
-    for typ in get_type_hints(dc).values():
-        s.update(g(typ))
+    for typ in hints.values():
+        s.update(typemodules(typ))
     return s
 
 
-def get_defaults(dc: type[DeclarativeBase]) -> dict[str, Any]:
+def get_defaults(
+    dc: type[DeclarativeBase],
+    hints: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    if hints is None:
+        hints = get_type_hints(dc)
     ret = {}
-    for k, v in get_type_hints(dc).items():
+    for k, v in hints.items():
         prop = getattr(dc, k).property
         if not hasattr(prop, "columns"):
             continue
@@ -71,7 +86,8 @@ def get_defaults(dc: type[DeclarativeBase]) -> dict[str, Any]:
 class PYDHandle:
     def __init__(self) -> None:
         self.imports: set[str] = set()
-        self.txt: list[str] = []
+        # class name and columns to render
+        self.models: list[tuple[str, dict[str, tuple[str, str | None]]]] = []
 
     def relationships(self, dc: type[DeclarativeBase]) -> dict[str, tuple[str, str]]:
         ret = {}
@@ -83,27 +99,24 @@ class PYDHandle:
         return ret
 
     def add(self, dcs: Sequence[type[DeclarativeBase]]) -> None:
-        dcs = list(dcs)
-        imports = {
-            s for dc in dcs for s in gettypes(dc) if s not in {"builtins", "__main__"}
-        }
-        self.imports.update(imports)
-
         def torepr(v: Any) -> str | None:
             if v is None:
                 return v
             return repr(v)
 
+        skip = {"builtins", "__main__"}
         for dc in dcs:
-            defaults = get_defaults(dc)
-            columns = {
-                k: (tos(get_args(v)[0]), torepr(defaults.get(k, None)))
-                for k, v in get_type_hints(dc).items()
-            }
+            # resolve the type hints once for both imports and columns
+            hints = get_type_hints(dc)
+            self.imports.update(gettypes(dc, hints) - skip)
+            defaults = get_defaults(dc, hints)
+            columns = {}
+            for k, v in hints.items():
+                columns[k] = (tos(get_args(v)[0]), torepr(defaults.get(k, None)))
 
             columns.update(self.relationships(dc))
 
-            self.txt.append(PY_TEMPLATE.render(name=dc.__name__, columns=columns))
+            self.models.append((dc.__name__, columns))
 
     def key(self, imp: str) -> str:
         if imp in {"typing", "types"}:
@@ -119,8 +132,9 @@ class PYDHandle:
         for v in sorted(self.imports, key=self.key):
             print(f"import {v}", file=out)
 
-        for t in self.txt:
-            print(t, file=out)
+        for name, columns in self.models:
+            PY_TEMPLATE.stream(name=name, columns=columns).dump(out)
+            print(file=out)
 
 
 def sqla_to_py(dcs: Sequence[type[DeclarativeBase]], out: IO[str]) -> None:
@@ -1,19 +1,42 @@
 from __future__ import annotations
 
+from typing import Any
+from typing import Callable
+from typing import TYPE_CHECKING
+
 import click
-from flask import current_app
-from flask import has_app_context
-from sqlalchemy import Table
 
 from ..cli import ts_cli
 from ..utils import maybeclose
-from .orm import datacolumn
-from .orm import dodatabase
-from .orm import find_all_models
-from .orm import model_ts
+
+if TYPE_CHECKING:
+    from sqlalchemy import Table
+
+
+def cache_options(func: Callable[..., Any]) -> Callable[..., Any]:
+    func = click.option(
+        "--refresh-cache",
+        is_flag=True,
+        help="ignore any cached schema and reflect again",
+    )(func)
+    func = click.option(
+        "--cache-dir",
+        default="~/.cache/flask-typescript",
+        show_default=True,
+        type=click.Path(file_okay=False),
+        help="directory for cached schemas",
+    )(func)
+    return click.option(
+        "--cache/--no-cache",
+        default=False,
+        help="cache the reflected database schema",
+    )(func)
 
 
 def geturl(url: str | None) -> list[str]:
+    from flask import current_app
+    from flask import has_app_context
+
     if not url:
         if not has_app_context():
             raise click.BadParameter("specify --url to database", param_hint="url")
@@ -55,11 +78,15 @@ def sqla() -> None:
     is_flag=True,
     help="don't output preamble",
 )
+@cache_options
 @click.argument("tables", nargs=-1)
 def tables_cmd(
     url: str | None,
     tables: tuple[str],
     out: str | None,
+    cache: bool,
+    cache_dir: str,
+    refresh_cache: bool,
     no_preamble: bool = False,
 ) -> None:
     """Typescript metadata from tables in sqlalchemy.
@@ -67,10 +94,19 @@ def tables_cmd(
     Create a typescript datastructure that has metadata
     such as maximum string length, data type of the SQL columns.
     """
+    from .orm import dodatabase
+
     urls = geturl(url)
     with maybeclose(out, "wt") as fp:
         for url_ in urls:
-            dodatabase(url_, *tables, preamble=not no_preamble, out=fp)
+            dodatabase(
+                url_,
+                *tables,
+                preamble=not no_preamble,
+                out=fp,
+                cache_dir=cache_dir if cache else None,
+                refresh=refresh_cache,
+            )
 
 
 @sqla.command("models")
@@ -88,15 +124,18 @@ def models_cmd(modules: tuple[str], out: str | None) -> None:
     If you have a function that generates these classes then use `:function_name`
     at the end of the module.
     """
+    from .orm import find_all_models
+    from .orm import model_ts
+    from .orm import ModelBuilder
 
     if not modules:
         return
 
     with maybeclose(out, "wt") as fp:
         print("// generated by flask-typescript", file=fp)
-
+        builder = ModelBuilder()
         for models in find_all_models(*modules):
-            model_ts(*models, out=fp)
+            model_ts(*models, out=fp, builder=builder)
 
 
 @sqla.command("models-meta")
@@ -126,6 +165,8 @@ def models_tables_cmd(
     If you have a function that generates these classes then use `:function_name`
     at the end of the module.
     """
+    from .orm import datacolumn
+    from .orm import find_all_models
     from .orm import table_ts
 
     if not modules:
@@ -137,30 +178,36 @@ def models_tables_cmd(
             datacolumn(fp)
 
         for models in find_all_models(*modules):
-            table_ts(out, [m.__table__ for m in models], metadata_only=True)  # type: ignore
+            table_ts(fp, [m.__table__ for m in models], metadata_only=True)  # type: ignore
 
 
 def get_tables(
     url: str | None,
     schema: str | None = None,
     tables: list[str] | None = None,
+    cache_dir: str | None = None,
+    refresh: bool = False,
 ) -> tuple[list[Table], list[str]]:
-    from sqlalchemy import create_engine, MetaData
+    from sqlalchemy.engine import make_url
+    from .orm import get_metadata
 
     urls = geturl(url)
     ttables: list[Table] = []
     uout = []
 
     for url in urls:
-        engine = create_engine(url)
-        uout.append(str(engine.url))  # hide password
-        meta = MetaData()
+        uout.append(str(make_url(url)))  # hide password
+        meta = get_metadata(
+            url,
+            *(tables or []),
+            schema=schema,
+            cache_dir=cache_dir,
+            refresh=refresh,
+        )
         if tables:
-            meta.reflect(bind=engine, only=tables, schema=schema)
             if schema is not None:
                 tables = [f"{schema}.{t}" for t in tables]
         else:
-            meta.reflect(bind=engine, schema=schema)
             tables = list(meta.tables.keys())
 
         ttables.extend([meta.tables[t] for t in sorted(tables)])
@@ -186,6 +233,7 @@ def get_tables(
     help="throw on unknown column type (instead of just guessing)",
 )
 @click.option("--abstract", is_flag=True, help="make classes abstract")
+@cache_options
 @click.argument("tables", nargs=-1)
 def tosqla(
     url: str | None,
@@ -195,12 +243,21 @@ def tosqla(
     schema: str | None,
     tables: tuple[str, ...],
     throw: bool,
+    cache: bool,
+    cache_dir: str,
+    refresh_cache: bool,
 ) -> None:
     """Render SQL tables into sqlalchemy.orm.Declarative classes."""
 
     from .mksqla import ModelMaker
 
-    ttables, uout = get_tables(url, schema, list(tables))
+    ttables, uout = get_tables(
+        url,
+        schema,
+        list(tables),
+        cache_dir=cache_dir if cache else None,
+        refresh=refresh_cache,
+    )
     mm = ModelMaker(
         with_tablename=not abstract,
         abstract=abstract,
@@ -230,6 +287,7 @@ def tosqla(
     is_flag=True,
     help="throw on unknown column type (instead of just guessing)",
 )
+@cache_options
 @click.argument("tables", nargs=-1)
 def topydantic(
     url: str | None,
@@ -237,12 +295,21 @@ def topydantic(
     schema: str | None,
     tables: tuple[str, ...],
     throw: bool,
+    cache: bool,
+    cache_dir: str,
+    refresh_cache: bool,
 ) -> None:
     """Render SQL tables into pydantic classes."""
 
     from .mksqla import ModelMaker
 
-    ttables, uout = get_tables(url, schema, list(tables))
+    ttables, uout = get_tables(
+        url,
+        schema,
+        list(tables),
+        cache_dir=cache_dir if cache else None,
+        refresh=refresh_cache,
+    )
     mm = ModelMaker(
         with_tablename=True,
         abstract=False,
@@ -274,6 +341,7 @@ def topydantic_cmd(
     at the end of the module.
     """
 
+    from .orm import find_all_models
     from .pyd import PYDHandle
 
     if not modules:
@@ -1,9 +1,18 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 
 
 NUMBER = re.compile(r"^\d+(\.\d*)?$")
+CLEAN = re.compile(r"\W|^(?=\d)")
+# ascii version of CLEAN's \W
+CLEAN_ASCII = str.maketrans(
+    {c: "_" for c in map(chr, range(128)) if not (c.isalnum() or c == "_")},
+)
+QUOTES = ('"', "'")
+# class names that would shadow sqlalchemy imports
+RESERVED = frozenset(["Column", "Table", "Integer"])
 Number = {
     "1": "one",
     "2": "two",
@@ -18,44 +27,51 @@ Number = {
 }
 
 
+@lru_cache(maxsize=4096)
 def pascal_case(name: str) -> str:
-    name = "".join(n[0].upper() + n[1:] for n in name.split("_"))
+    name = "".join([n[:1].upper() + n[1:] for n in name.split("_")])
     if name.endswith("s"):
         name = name[:-1]
     name = name.replace(".", "_")
-    if name in {"Column", "Table", "Integer"}:
+    if name in RESERVED:
         name = name + "Class"
     return name
 
 
+@lru_cache(maxsize=4096)
 def pyname(name: str) -> str:
     name = name.strip()
     if name.isidentifier():
         return name
-    if name[0].isdigit():
-        name = Number[name[0]] + name[1:]
+    # only ascii digits are spelled out, clean() deals with the rest
+    digit = Number.get(name[:1])
+    if digit is not None:
+        name = digit + name[1:]
     name = clean(name)
     return name
 
 
+def quoted(s: str) -> bool:
+    q = s[:1]
+    return q in QUOTES and s[-1:] == q
+
+
 def quote(s: str) -> str:
-    for q in ['"', "'"]:
-        if s.startswith(q) and s.endswith(q):
-            if NUMBER.match(s[1:-1]):
-                return s
+    if quoted(s) and NUMBER.match(s[1:-1]):
+        return s
     return f'"{s}"'
 
 
 def chop(s: str) -> str:
-    for q in ['"', "'"]:
-        if s.startswith(q) and s.endswith(q):
-            return s[1:-1]
-    return s
+    return s[1:-1] if quoted(s) else s
 
 
 def clean(s: str) -> str:
     """replace non words or digits with underscores"""
-    return re.sub(r"\W|^(?=\d)", "_", s)
+    if not s.isascii():
+        return CLEAN.sub("_", s)
+    s = s.translate(CLEAN_ASCII)
+    return "_" + s if s[:1].isdigit() else s
 
 
 def jsname(name: str) -> str:
@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import collections
 import decimal
+import sys
 from abc import ABCMeta
 from abc import abstractmethod
 from collections.abc import Mapping
 from collections.abc import Sequence
 from dataclasses import dataclass
 from dataclasses import Field
+from dataclasses import field
 from dataclasses import fields
 from dataclasses import is_dataclass
 from dataclasses import MISSING
@@ -15,9 +17,13 @@ from dataclasses import replace
 from datetime import date
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
+from functools import wraps
 from importlib import import_module
 from inspect import signature
 from types import FunctionType
+from types import MappingProxyType
+from types import ModuleType
 from typing import Any
 from typing import Callable
 from typing import cast
@@ -28,9 +34,11 @@ from typing import get_type_hints
 from typing import Iterator
 from typing import Literal
 from typing import Type
+from typing import TypeAlias
 from typing import TypeGuard
 from typing import TypeVar
 from typing import Union
+from weakref import WeakKeyDictionary
 
 from pydantic import BaseModel
 from pydantic.fields import FieldInfo
@@ -45,43 +53,76 @@ from .zod import TSField
 from .zod import ZOD
 from .zod import ZZZ
 
+try:
+    from types import UnionType
+except ImportError:  # python < 3.10
+    UnionType = Union  # type: ignore
+
 try:
     from typing import is_typeddict
 except ImportError:
+    from typing import _TypedDictMeta  # type: ignore
 
     def is_typeddict(tp: object) -> bool:
-        from typing import _TypedDictMeta  # type: ignore
-
         return isinstance(tp, _TypedDictMeta)
 
 
 INDENT = "    "
 NL = "\n"
 
-TSTypeable = Union[Type[Any], Callable[..., Any]]
+TSTypeable: TypeAlias = type[Any] | Callable[..., Any]
+
+
+def cached_predicate(func: Callable[[Any], bool]) -> Callable[[Any], bool]:
+    """Memoize a predicate on types, falling back for unhashable arguments"""
+    cached = lru_cache(maxsize=2048)(func)
+
+    @wraps(func)
+    def predicate(obj: Any) -> bool:
+        try:
+            return cached(obj)
+        except TypeError:  # unhashable
+            return func(obj)
 
-TSThing = Union["TSFunction", "TSInterface", "TSEnum"]
+    return predicate
 
 
+@cached_predicate
 def is_dataclass_type(obj: Any) -> bool:
     return isinstance(obj, type) and is_dataclass(obj)
 
 
+# scan the mro directly: issubclass(typ, BaseModel) goes through
+# ABCMeta.__subclasscheck__
 def is_pydantic_type(typ: Any) -> TypeGuard[type[BaseModel]]:
-    return isinstance(typ, type) and issubclass(typ, BaseModel)
+    return isinstance(typ, type) and BaseModel in typ.__mro__
 
 
+@cached_predicate
 def is_file_storage(typ: Any) -> bool:
-    return isinstance(typ, type) and issubclass(typ, FileStorage)
+    return isinstance(typ, type) and FileStorage in typ.__mro__
+
+
+@cached_predicate
+def is_model_type(typ: Any) -> bool:
+    """a dataclass or pydantic class: one cached lookup for both predicates"""
+    return is_dataclass_type(typ) or is_pydantic_type(typ)
 
 
+@cached_predicate
 def is_interesting(typ: Any) -> bool:
-    return (
-        is_pydantic_type(typ)
-        or is_dataclass_type(typ)
-        or is_typeddict(typ)
-        or lenient_issubclass(typ, Enum)
-    )
+    return is_model_type(typ) or is_typeddict(typ) or lenient_issubclass(typ, Enum)
+
+
+_DC_FIELDS: WeakKeyDictionary[type[Any], tuple[Field[Any], ...]] = WeakKeyDictionary()
+
+
+def dc_fields(cls: type[Any]) -> tuple[Field[Any], ...]:
+    """dataclasses.fields() memoized per class"""
+    ret = _DC_FIELDS.get(cls)
+    if ret is None:
+        ret = _DC_FIELDS[cls] = fields(cls)
+    return ret
 
 
 def get_dc_defaults(cls: type[Any]) -> dict[str, Any]:
@@ -101,9 +142,12 @@ def get_dc_defaults(cls: type[Any]) -> dict[str, Any]:
             return ret
         return MISSING
 
-    return {
-        f.name: d for f in fields(cls) for d in [get_default(f)] if d is not MISSING
-    }
+    ret = {}
+    for f in dc_fields(cls):
+        d = get_default(f)
+        if d is not MISSING:
+            ret[f.name] = d
+    return ret
 
 
 # def get_py_defaults2(cls: type[Any]) -> dict[str, Any]:
@@ -138,22 +182,14 @@ def get_py_defaults(cls: type[Any]) -> dict[str, Any]:
             f"{cls} is not a subclass of pydantic.BaseModel",
         )
 
-    def get_default(f: FieldInfo) -> Any:
-        r = f.default
-
-        if r is PydanticUndefined:
-            return MISSING
-        return r
-
     return {
-        name: d
+        name: f.default
         for name, f in get_py_fields(cls).items()
-        for d in [get_default(f)]
-        if d is not MISSING
+        if f.default is not PydanticUndefined
     }
 
 
-@dataclass
+@dataclass(slots=True)
 class Annotation:
     name: str
     type: type[Any]
@@ -168,6 +204,21 @@ class Annotation:
         return is_file_storage(self.type)
 
 
+@lru_cache(maxsize=1024)
+def func_params(func: Callable[..., Any]) -> tuple[tuple[str, ...], dict[str, Any]]:
+    """Parameter names and defaults of a function (treat as read-only)"""
+    params = signature(func).parameters
+    defaults = {k: v.default for k, v in params.items() if v.default is not v.empty}
+    return tuple(params), defaults
+
+
+# cls_or_func => {id(ns): (ns, annotations)}
+_ANNOTATIONS: WeakKeyDictionary[
+    Any,
+    dict[int, tuple[Any, dict[str, Annotation]]],
+] = WeakKeyDictionary()
+
+
 def get_annotations(
     cls_or_func: TSTypeable,
     ns: Any | None = None,
@@ -176,15 +227,28 @@ def get_annotations(
 
     May throw a `NameError` if annotation is only imported when
     typing.TYPE_CHECKING is True.
+
+    Results are cached per class/function and namespace.
     """
+    try:
+        cache = _ANNOTATIONS.setdefault(cls_or_func, {})
+    except TypeError:  # not weak referenceable
+        return _get_annotations(cls_or_func, ns)
+    hit = cache.get(id(ns))
+    if hit is None or hit[0] is not ns:
+        hit = cache[id(ns)] = (ns, _get_annotations(cls_or_func, ns))
+    return dict(hit[1])
+
+
+def _get_annotations(
+    cls_or_func: TSTypeable,
+    ns: Any | None = None,
+) -> dict[str, Annotation]:
     d = get_type_hints(cls_or_func, localns=ns, include_extras=False)
     if isinstance(cls_or_func, FunctionType):
-        sig = signature(cls_or_func)
-        defaults = {
-            k: v.default for k, v in sig.parameters.items() if v.default is not v.empty
-        }
+        params, defaults = func_params(cls_or_func)
         # add untyped parameters
-        d_ = {k: d.get(k, Any) for k in sig.parameters}
+        d_ = {k: d.get(k, Any) for k in params}
         if "return" in d:
             d_["return"] = d["return"]
         d = d_
@@ -199,11 +263,34 @@ def get_annotations(
             del d["__clsname__"]
         defaults = get_dc_defaults(cast(Type[Any], cls_or_func))
 
-    return {k: Annotation(k, v, defaults.get(k, MISSING)) for k, v in d.items()}
+    return {
+        k: Annotation(k, d[k], defaults.get(k, MISSING)) for k in map(sys.intern, d)
+    }
+
+
+class CachedTS(metaclass=ABCMeta):
+    """Renders `to_ts()` once: the frozen subclasses need a `_ts` field"""
+
+    __slots__ = ()
+    _ts: str | None
+
+    def to_ts(self) -> str:
+        ts = self._ts
+        if ts is None:
+            ts = self.render()
+            object.__setattr__(self, "_ts", ts)
+        return ts
+
+    @abstractmethod
+    def render(self) -> str:
+        raise NotImplementedError("need to implement typescript generation")
+
+    def __str__(self) -> str:
+        return self.to_ts()
 
 
-@dataclass
-class TSInterface:
+@dataclass(slots=True, frozen=True)
+class TSInterface(CachedTS):
     name: str
     fields: list[TSField]
 
@@ -211,6 +298,7 @@ class TSInterface:
     indent: str = INDENT
     nl: str = NL
     interface: Literal["interface", "type", "namespace"] = "namespace"
+    _ts: str | None = field(default=None, init=False, repr=False, compare=False)
 
     @property
     def is_generic(self) -> bool:
@@ -220,12 +308,12 @@ class TSInterface:
     #     ret = [f.arg for f in self.fields if f.is_generic]
     #     return ret
 
-    def to_ts(self) -> str:
+    def render(self) -> str:
         def ts_fields() -> str:
             astype = self.interface == "namespace"
-            nl = self.nl
-            return nl.join(
-                f"{self.indent}{f.to_ts(astype=astype)}" for f in self.fields
+            indent = self.indent
+            return self.nl.join(
+                [f"{indent}{f.to_ts(astype=astype)}" for f in self.fields]
             )
 
         export = "export " if self.export else ""
@@ -242,12 +330,9 @@ class TSInterface:
     def anonymous(self) -> ZOD:
         return ZZZ.object(self.fields)
 
-    def __str__(self) -> str:
-        return self.to_ts()
-
 
-@dataclass
-class TSFunction:
+@dataclass(slots=True, frozen=True)
+class TSFunction(CachedTS):
     name: str
     args: list[TSField]
     returntype: ZOD
@@ -255,14 +340,16 @@ class TSFunction:
     export: bool = True
     isasync: bool = False
     result: bool = False
+    _ts: str | None = field(default=None, init=False, repr=False, compare=False)
 
     def remove_args(self, *args: str) -> TSFunction:
-        a = [f for f in self.args if f.name not in set(args)]
+        drop = frozenset(args)
+        a = [f for f in self.args if f.name not in drop]
         return replace(self, args=a)
 
-    def to_ts(self) -> str:
+    def render(self) -> str:
         def ts_args() -> str:
-            return ", ".join(f.to_ts() for f in self.args)
+            return ", ".join([f.to_ts() for f in self.args])
 
         sargs = ts_args()
         export = "export " if self.export else ""
@@ -274,9 +361,6 @@ class TSFunction:
     def anonymous(self) -> ZOD:
         return ZZZ.function(self.args, self.async_returntype)
 
-    def __str__(self) -> str:
-        return self.to_ts()
-
     @property
     def async_returntype(self) -> ZOD:
         rt = self.returntype
@@ -290,27 +374,49 @@ class TSFunction:
         return ZZZ.to_generic_args(self.args + [self.returntype])
 
 
-@dataclass
-class TSEnum:
+@dataclass(slots=True, frozen=True)
+class TSEnum(CachedTS):
     name: str
     fields: list[ZOD]
     export: bool = True
+    _ts: str | None = field(default=None, init=False, repr=False, compare=False)
 
-    def to_ts(self) -> str:
-        args = " | ".join(f.to_ts() for f in self.fields)
+    def render(self) -> str:
+        args = " | ".join([f.to_ts() for f in self.fields])
         export = "export " if self.export else ""
         return f"{export}type {self.name} = {args}"
 
     def anonymous(self) -> ZOD:
         return ZZZ.union(self.fields)
 
-    def __str__(self) -> str:
-        return self.to_ts()
+
+TSThing: TypeAlias = TSFunction | TSInterface | TSEnum
+
+
+# exact type(value) => typescript repr, for the common default values
+REPRS: dict[type[Any], Callable[[Any], str]] = {
+    type(None): lambda v: "null",
+    str: repr,
+    bytes: lambda v: repr(v)[1:],  # chop b off b'xxx'
+    bool: lambda v: repr(v).lower(),
+    int: repr,
+    float: repr,
+    decimal.Decimal: lambda v: repr(float(v)),
+}
+
+
+def get_module(name: str) -> ModuleType:
+    """sys.modules lookup, importing only if needed"""
+    m = sys.modules.get(name)
+    if m is None:
+        m = import_module(name)
+    return m
 
 
 class BaseBuilder(metaclass=ABCMeta):
     def __init__(self, ns: dict[str, Any] | None = None):
         self.build_stack: list[TSTypeable] = []
+        self.building: set[int] = set()  # ids of objects in build_stack
         self.ns = ns
         self.seen: dict[str, str] = {}
         self.built: set[str] = set()
@@ -318,20 +424,33 @@ class BaseBuilder(metaclass=ABCMeta):
     def get_annotations(self, cls: TSTypeable) -> dict[str, Annotation]:
         return get_annotations(cls, self.ns)
 
+    @staticmethod
+    def clear_cache() -> None:
+        """Forget cached annotations (e.g. after redefining a class)"""
+        _ANNOTATIONS.clear()
+
     def is_being_built(self, o: TSTypeable) -> bool:
-        return any(o == s for s in self.build_stack)
+        return id(o) in self.building
 
     def current_module(self) -> dict[str, Any]:
         if self.build_stack:
-            m = import_module(self.build_stack[-1].__module__)
-            return m.__dict__
+            return get_module(self.build_stack[-1].__module__).__dict__
         return {}
 
     # pylint: disable=too-many-return-statements
     def ts_repr(self, value: Any) -> str:
+        cls = type(value)
+        handler = REPRS.get(cls)
+        if handler is not None:
+            return handler(value)
         ts_repr = self.ts_repr
-        if value is None:
-            return "null"
+        # exact containers skip the abc isinstance checks below
+        if cls is list or cls is tuple:
+            args = ", ".join(ts_repr(v) for v in value)
+            return f"[{args}]"
+        if cls is dict:
+            args = ", ".join(f"{str(k)}: {ts_repr(v)}" for k, v in value.items())
+            return f"{{{args}}}"
         if isinstance(value, FunctionType):  # field(default_factory=lambda:...)
             return ts_repr(value())
         if isinstance(value, decimal.Decimal):
@@ -372,8 +491,7 @@ class BaseBuilder(metaclass=ABCMeta):
 
     def create_builder(self, name: str, module: str) -> Callable[[], TSThing | None]:
         def build_func() -> TSThing | None:
-            m = import_module(module)
-            typ = getattr(m, name)
+            typ = getattr(get_module(module), name)
             if not is_interesting(typ):
                 return None
             return self.get_type_ts(typ)
@@ -385,22 +503,85 @@ def toz(s: str) -> ZOD:
     return getattr(ZZZ, s)()  # type: ignore[no-any-return]
 
 
-DEFAULTS: dict[type[Any], ZOD] = {
-    str: toz("string"),
-    int: toz("number"),
-    float: toz("number"),
-    type(None): toz("null"),
-    bytes: toz("string"),  # TODO see if this works
-    bool: toz("boolean"),
-    decimal.Decimal: toz("number"),
-    FileStorage: toz("File"),
-    date: toz("string"),
-    datetime: toz("string"),
+DEFAULTS: Mapping[type[Any], ZOD] = MappingProxyType(
+    {
+        str: toz("string"),
+        int: toz("number"),
+        float: toz("number"),
+        type(None): toz("null"),
+        bytes: toz("string"),  # TODO see if this works
+        bool: toz("boolean"),
+        decimal.Decimal: toz("number"),
+        FileStorage: toz("File"),
+        date: toz("string"),
+        datetime: toz("string"),
+    }
+)
+
+
+def _as_one(iargs: list[ZOD]) -> ZOD:
+    if len(iargs) == 1:
+        return iargs[0]
+    # assume Union
+    return ZZZ.union(iargs)
+
+
+def _as_array(iargs: list[ZOD]) -> ZOD:
+    return _as_one(iargs).array()
+
+
+def _as_map(iargs: list[ZOD]) -> ZOD:
+    # e.g. dict[str, int]
+    k, v = iargs
+    return ZZZ.map(k, v)
+
+
+# get_origin(typ) => zod for the type arguments
+ORIGINS: dict[Any, Callable[[list[ZOD]], ZOD]] = {
+    dict: _as_map,
+    tuple: ZZZ.tuple,
+    list: _as_array,
+    set: _as_array,
+    frozenset: _as_array,
+    # common abstract/collections origins: saves an ABC issubclass check
+    Mapping: _as_map,
+    collections.abc.MutableMapping: _as_map,
+    collections.OrderedDict: _as_map,
+    collections.defaultdict: _as_map,
+    Sequence: _as_array,
+    collections.abc.MutableSequence: _as_array,
+    collections.abc.Set: _as_array,
+    collections.abc.MutableSet: _as_array,
+    collections.deque: _as_array,
+    # typing.Union and X | Y always have at least two members
+    Union: ZZZ.union,
+    UnionType: ZZZ.union,
+    Literal: _as_one,
 }
 
+STR_BYTES = (str, bytes)
+
+
+@cached_predicate
+def is_array_type(cls: type[Any]) -> bool:
+    return issubclass(
+        cls,
+        (collections.abc.Sequence, collections.abc.Set),
+    ) and not issubclass(
+        cls,
+        STR_BYTES,
+    )  # these are both sequences but not arrays
+
+
+@cached_predicate
+def is_mapping_type(cls: type[Any]) -> bool:
+    return issubclass(cls, Mapping)
+
 
 class TSBuilder(BaseBuilder):
-    TS = DEFAULTS.copy()
+    # read-only: subclasses override these with their own mappings
+    TS: Mapping[Any, ZOD] = DEFAULTS
+    ORIGINS: Mapping[Any, Callable[[list[ZOD]], ZOD]] = MappingProxyType(ORIGINS)
 
     def __init__(
         self,
@@ -412,26 +593,30 @@ class TSBuilder(BaseBuilder):
         super().__init__(ns)
         self.use_name = use_name
         self.ignore_defaults = ignore_defaults
-
-    def process_seen(
-        self,
-        seen: dict[str, str] | None = None,
-    ) -> Iterator[Callable[[], TSThing | None]]:
-        if seen is None:
-            seen = {}
-        seen.update(self.seen)
-        self.seen = {}
-        for name in self.built:
-            if name in seen:
-                del seen[name]
-
-        for name, module in seen.items():
-            yield self.create_builder(name, module)
+        # id(o) => (o, ns, result, names added to self.seen)
+        self.ts_cache: dict[
+            int,
+            tuple[TSTypeable, Any, TSThing, list[tuple[str, str]]],
+        ] = {}
+        self.recording: list[list[tuple[str, str]]] = []
+        # (id(typ), is_arg) => (typ, result, names added to self.seen)
+        self.zod_cache: dict[
+            tuple[int, bool],
+            tuple[Any, ZOD, list[tuple[str, str]]],
+        ] = {}
+        # number of forward references resolved so far
+        self.forward_refs = 0
+
+    def add_seen(self, name: str, module: str) -> None:
+        self.seen[name] = module
+        for added in self.recording:
+            added.append((name, module))
 
     def __call__(self, o: TSTypeable) -> TSThing:
         return self.get_type_ts(o)
 
     def forward_ref(self, type_name: str) -> ZOD:
+        self.forward_refs += 1
         if type_name in self.seen:
             return ZZZ.ref(type_name)
         g = self.current_module()
@@ -458,16 +643,45 @@ class TSBuilder(BaseBuilder):
         return ZZZ.typevar(typ.__name__, iargs)
 
     def type_to_zod(self, typ: type[Any], is_arg: bool = False) -> ZOD:
-        if is_dataclass_type(typ) or is_pydantic_type(typ):
+        if type(typ) is type:  # fast path for primitives e.g. int, str
+            z = self.TS.get(typ)
+            if z is not None:
+                return z
+        if not self.use_name:
+            # result depends on what has already been built
+            return self.build_zod(typ, is_arg)
+        # annotations are cached per class so the same typ objects recur
+        key = (id(typ), is_arg)
+        hit = self.zod_cache.get(key)
+        if hit is not None and hit[0] is typ:
+            for name, module in hit[2]:
+                self.add_seen(name, module)
+            return hit[1]
+        added: list[tuple[str, str]] = []
+        forward_refs = self.forward_refs
+        self.recording.append(added)
+        try:
+            z = self.build_zod(typ, is_arg)
+        finally:
+            self.recording.pop()
+        # forward refs depend on the module being built: don't cache those
+        if self.forward_refs == forward_refs:
+            self.zod_cache[key] = (typ, z, added)
+        return z
+
+    def build_zod(self, typ: type[Any], is_arg: bool = False) -> ZOD:
+        if is_model_type(typ):
+            name = typ.__name__
+            # cheapest tests first: use_name is the default
             if (
-                self.is_being_built(typ)
+                self.use_name
                 or is_arg
-                or typ.__name__ in self.seen
-                or typ.__name__ in self.built
-                or self.use_name
+                or self.is_being_built(typ)
+                or name in self.seen
+                or name in self.built
             ):  # recursive
-                self.seen[typ.__name__] = typ.__module__
-                return ZZZ.ref(typ.__name__)  # just use name
+                self.add_seen(name, typ.__module__)
+                return ZZZ.ref(name)  # just use name
             ret = self.get_type_ts(typ)
             # we are going to annonymize it e.g. => {key: number[], key2:string}
             # because we don't need full `export type Name = {....}`
@@ -479,17 +693,25 @@ class TSBuilder(BaseBuilder):
         if isinstance(typ, TypeVar):
             return self.typevar_to_zod(typ)
 
-        # e.g. cls is the <class 'list'> while typ is list[int]
-        cls = get_origin(typ)
-        if cls is None:
-            cls = typ
+        if isinstance(typ, type):
+            # plain classes have no origin or type arguments
+            cls: Any = typ
+            targs: tuple[Any, ...] = ()
+        else:
+            # e.g. cls is the <class 'list'> while typ is list[int]
+            cls = get_origin(typ)
+            if cls is None:
+                cls = typ
+            targs = get_args(typ)
 
         is_type = isinstance(cls, type)
-        targs = get_args(typ)
         if targs:
             iargs = self.arglist_to_zod(targs)
+            handler = self.ORIGINS.get(cls)
+            if handler is not None:
+                return handler(iargs)
 
-            if is_type and issubclass(cls, Mapping):
+            if is_type and is_mapping_type(cls):
                 # e.g. dict[str, int]
                 k, v = iargs
                 args = ZZZ.map(k, v)
@@ -507,10 +729,11 @@ class TSBuilder(BaseBuilder):
                         args = ZZZ.union(iargs)
         else:
             if is_type:
-                if cls not in self.TS:
-                    self.seen[cls.__name__] = cls.__module__
+                z = self.TS.get(cls)
+                if z is None:
+                    self.add_seen(cls.__name__, cls.__module__)
                     return ZZZ.ref(cls.__name__)
-                args = self.TS[cls]
+                args = z
             else:
                 if isinstance(cls, str) and not is_arg:
                     return self.forward_ref(cls)
@@ -518,14 +741,7 @@ class TSBuilder(BaseBuilder):
                     return ZZZ.any()
                 args = ZZZ.literal(self.ts_repr(cls))  # Literal
 
-        if (
-            is_type
-            and issubclass(cls, (collections.abc.Sequence, collections.abc.Set))
-            and not issubclass(
-                cls,
-                (str, bytes),
-            )  # these are both sequences but not arrays
-        ):
+        if is_type and is_array_type(cls):
             args = args.array()
         return args
 
@@ -533,20 +749,24 @@ class TSBuilder(BaseBuilder):
         self,
         cls: TSTypeable,
         is_arg: bool = False,
-    ) -> Iterator[TSField]:
-        a = self.get_annotations(cls)
+    ) -> list[TSField]:
+        type_to_zod = self.type_to_zod
+        ts_repr = self.ts_repr
+        ignore_defaults = self.ignore_defaults
 
-        for name, annotation in a.items():
-            ts_type_as_zod = self.type_to_zod(annotation.type, is_arg=is_arg)
-            yield ts_type_as_zod.field(
+        # Annotations are cached per class: just read their slots
+        return [
+            type_to_zod(a.type, is_arg=is_arg).field(
                 name=name,
-                default=self.ts_repr(annotation.default)
-                if annotation.has_default and not self.ignore_defaults
-                else None,
+                default=None
+                if ignore_defaults or a.default is MISSING
+                else ts_repr(a.default),
             )
+            for name, a in self.get_annotations(cls).items()
+        ]
 
     def get_dc_ts(self, typ: type[Any]) -> TSInterface:
-        fieldslist = list(self.get_field_types(typ))
+        fieldslist = self.get_field_types(typ)
         return TSInterface(
             name=typ.__name__,
             fields=fieldslist,
@@ -557,7 +777,7 @@ class TSBuilder(BaseBuilder):
         if not callable(func):
             raise TypeError(f"{func} is not a function")
 
-        ft = list(self.get_field_types(func, is_arg=True))
+        ft = self.get_field_types(func, is_arg=True)
         args = [f for f in ft if f.name != "return"]
         rt = [f for f in ft if f.name == "return"]
         if rt:
@@ -573,7 +793,44 @@ class TSBuilder(BaseBuilder):
 
     def get_type_ts(self, o: TSTypeable) -> TSThing:
         # main entrypoint
+        # with use_name the result doesn't depend on what has already been
+        # built so we can reuse it, replaying the names it added to self.seen
+        hit = self.ts_cache.get(id(o))
+        if hit is not None and hit[0] is o and hit[1] is self.ns:
+            ret = hit[2]
+            for name, module in hit[3]:
+                self.add_seen(name, module)
+        else:
+            added: list[tuple[str, str]] = []
+            self.recording.append(added)
+            try:
+                ret = self.build_type_ts(o)
+            finally:
+                self.recording.pop()
+            if self.use_name or self.is_atomic(o, ret):
+                self.ts_cache[id(o)] = (o, self.ns, ret, added)
+        if isinstance(ret, TSInterface):
+            self.built.add(ret.name)
+            if ret.name in self.seen:
+                del self.seen[ret.name]
+        return ret
+
+    def is_atomic(self, o: TSTypeable, ret: TSThing) -> bool:
+        """True if ret doesn't depend on what has already been built
+        i.e. an enum or all the field types are primitives such as int, str"""
+        if isinstance(ret, TSEnum):
+            return True
+        TS = self.TS
+        return all(
+            type(a.type) is type and a.type in TS
+            for a in self.get_annotations(o).values()
+        )
+
+    def build_type_ts(self, o: TSTypeable) -> TSThing:
         self.build_stack.append(o)
+        oid = id(o)
+        pushed = oid not in self.building
+        self.building.add(oid)
         try:
             ret: TSThing
             if isinstance(o, FunctionType):
@@ -582,12 +839,11 @@ class TSBuilder(BaseBuilder):
                 ret = self.get_enum_ts(cast(type[Enum], o))
             else:
                 ret = self.get_dc_ts(cast(Type[Any], o))
-                self.built.add(ret.name)
-                if ret.name in self.seen:
-                    del self.seen[ret.name]
             return ret
         finally:
             self.build_stack.pop()
+            if pushed:
+                self.building.discard(oid)
 
     def get_enum_ts(self, enum: type[Enum]) -> TSEnum:
         return TSEnum(
@@ -1,97 +1,132 @@
 from __future__ import annotations
 
 import json
+from collections import deque
 from typing import Any
 
 from pydantic import BaseModel
 
 from ..typing import INDENT
 from ..typing import NL
+from .converter import locate_schema
 
 # UNUSED ....
 
 
-def jsonrepr(v):
-    return json.dumps(v)
+JSON_CONSTS = {None: "null", True: "true", False: "false"}
 
 
-def to_ts(model: type[BaseModel], seen: set[str] | None = None) -> str:
+def jsonrepr(v, dumps=json.dumps):
+    t = type(v)
+    if v is None or t is bool:
+        return JSON_CONSTS[v]
+    if t is int:
+        return repr(v)
+    # floats (nan, inf) and strings (escaping) need the real encoder
+    return dumps(v)
+
+
+def to_ts(model: type[BaseModel], seen: dict[str, str] | None = None) -> str:
+    """`seen` maps each emitted model/definition name to its typescript"""
     if seen is None:
-        seen = set()
+        seen = {}
     if model.__name__ in seen:
         return ""
-    schema = model.schema()
-    try:
-        return to_ts_schema(schema, seen)
-    finally:
-        seen.add(model.__name__)
-
-
-def to_ts_schema(schema: dict[str, Any], seen: set[str]) -> str:
-    from .converter import locate_schema
-
-    def props(definitions):
-        ret = []
-
-        def gettype(p):
-            if "type" not in p:
-                if "$ref" in p:
-                    _, typ = locate_schema(p["$ref"])
-                elif "allOf" in p:
-                    typ = "[" + " , ".join(gettype(t["$ref"]) for t in p["allOf"]) + "]"
-                elif "anyOf" in p:
-                    typ = " | ".join(gettype(t["$ref"]) for t in p["anyOf"])
-                else:
-                    # oneOf
-                    raise ValueError("can't find type!")
-            else:
-                typ = p["type"]
-            if typ == "array":
-                islist = "[]"
-                typ = gettype(p["items"])
-            else:
-                islist = ""
-            if typ in {"integer", "float"}:
-                typ = "number"
-            return f"{typ}{islist}"
-
-        for name, p in definitions.items():
-            typ = gettype(p)
-            if "default" in p:
-                q = "?"
-                v = jsonrepr(p["default"])
-                default = f" /* ={v} */"
-            else:
-                q = ""
-                default = ""
-            row = f"{name}{q}: {typ}{default};"
-            ret.append(row)
-        return ret
-
-    out = set()
-    definitions = schema.get("definitions")
-
-    if definitions:
-        for k, d in definitions.items():
-            if k in seen:
-                continue
-            s = to_ts_schema(d, seen)
-            out.add(s)
-            seen.add(k)
-    # might not have properties if we have a self-ref type:
-    #
-    # class LinkedList(BaseModel):
-    #   val: int = 123
-    #   next: LinkedList|None = None
-    #
-    # only {'$ref': '#/definitions/LinkedList', 'definitions': {...}}
-    if "properties" in schema:
-        ret = props(schema["properties"])
-
-        attrs = INDENT + (NL + INDENT).join(ret)
-
-        s = f"""export type {schema['title']} = {{
+    # one json schema generation for the whole model graph: referenced
+    # models arrive as "definitions" rather than via further to_ts calls
+    schema = model.model_json_schema(ref_template="#/definitions/{model}")
+    if "$defs" in schema:
+        schema["definitions"] = schema.pop("$defs")
+    seen[model.__name__] = ts = to_ts_schema(schema, seen)
+    return ts
+
+
+def _ref(p: dict[str, Any]) -> str:
+    # e.g. #/definitions/Type => Type
+    return locate_schema(p["$ref"]).path[-1]
+
+
+def _allof(p: dict[str, Any]) -> str:
+    return "[" + " , ".join(gettype(t) for t in p["allOf"]) + "]"
+
+
+def _anyof(p: dict[str, Any]) -> str:
+    return " | ".join(gettype(t) for t in p["anyOf"])
+
+
+HANDLERS = {"$ref": _ref, "allOf": _allof, "anyOf": _anyof}
+
+
+def gettype(p: dict[str, Any]) -> str:
+    if "type" not in p:
+        for key, handler in HANDLERS.items():
+            if key in p:
+                typ = handler(p)
+                break
+        else:
+            # oneOf
+            raise ValueError("can't find type!")
+    else:
+        typ = p["type"]
+    if typ == "array":
+        islist = "[]"
+        typ = gettype(p["items"])
+    else:
+        islist = ""
+    if typ in {"integer", "float"}:
+        typ = "number"
+    return f"{typ}{islist}"
+
+
+def props(definitions: dict[str, Any]) -> list[str]:
+    ret = []
+    for name, p in definitions.items():
+        typ = gettype(p)
+        if "default" in p:
+            q = "?"
+            v = jsonrepr(p["default"])
+            default = f" /* ={v} */"
+        else:
+            q = ""
+            default = ""
+        row = f"{name}{q}: {typ}{default};"
+        ret.append(row)
+    return ret
+
+
+def to_ts_schema(schema: dict[str, Any], seen: dict[str, str]) -> str:
+    # definitions in declaration order, then the schema itself
+    out: list[str] = []
+    top: list[str] = []
+    # worklist of (definition name, schema); each definition is queued once
+    work: deque[tuple[str | None, dict[str, Any]]] = deque([(None, schema)])
+    while work:
+        name, schema = work.popleft()
+        definitions = schema.get("definitions")
+        if definitions:
+            for k, d in definitions.items():
+                if k in seen:
+                    continue
+                seen[k] = ""
+                work.append((k, d))
+        # might not have properties if we have a self-ref type:
+        #
+        # class LinkedList(BaseModel):
+        #   val: int = 123
+        #   next: LinkedList|None = None
+        #
+        # only {'$ref': '#/definitions/LinkedList', 'definitions': {...}}
+        if "properties" in schema:
+            ret = props(schema["properties"])
+
+            attrs = INDENT + (NL + INDENT).join(ret)
+
+            s = f"""export type {schema['title']} = {{
 {attrs}
 }}"""
-        out.add(s)
-    return "\n".join(out)
+            if name is None:
+                top.append(s)
+            else:
+                out.append(s)
+                seen[name] = s
+    return "\n".join(out + top)
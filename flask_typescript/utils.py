@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 import re
 from contextlib import contextmanager
+from functools import lru_cache
 from importlib import resources
 from typing import Any
 from typing import Callable
@@ -27,27 +28,25 @@ def lenient_issubclass(
 
 def flatten(json_iter: Iterator[tuple[str, Any]]) -> Iterator[tuple[str, Any]]:
     """flatten a nested dictionary into a top level dictionary with "dotted" keys"""
-    for key, val in json_iter:
-        if isinstance(val, dict):
-            for k, v in flatten((k, v) for k, v in val.items()):
-                yield f"{key}.{k}", v
-        else:
+    # stack of (dotted prefix, items still to visit) instead of nested generators
+    # the prefix carries its trailing "." so each key is built exactly once
+    stack: list[tuple[str | None, Iterator[tuple[str, Any]]]] = [(None, json_iter)]
+    while stack:
+        prefix, items = stack[-1]
+        for key, val in items:
+            if prefix is not None:
+                key = f"{prefix}{key}"
+            if isinstance(val, dict):
+                stack.append((f"{key}.", iter(val.items())))
+                break
             yield key, val
+        else:
+            stack.pop()
 
 
 def unflatten(md: MultiDict[str, Any]) -> dict[str, Any]:
-    ret: dict[str, Any] = {}
-    for key, val in md.items(multi=True):
-        if key in ret:
-            v = ret[key]
-            if isinstance(v, list):
-                v.append(val)
-            else:
-                ret[key] = [v, val]
-        else:
-            ret[key] = val
-
-    return ret
+    # MultiDict already groups values by key (lists() returns fresh copies)
+    return {key: vals[0] if len(vals) == 1 else vals for key, vals in md.lists()}
 
 
 def dedottify(json: dict[str, Any], recursive: bool = False) -> dict[str, Any]:
@@ -61,9 +60,8 @@ def dedottify(json: dict[str, Any], recursive: bool = False) -> dict[str, Any]:
             *keylist, last = key.split(".")
             tgt = ret
             for k in keylist:
-                if k not in tgt:
-                    tgt[k] = {}
-                tgt = tgt[k]
+                # a single probe rather than `in` + set + get
+                tgt = tgt.setdefault(k, {})
                 if not isinstance(tgt, dict):
                     raise ValueError(f"{key} inconsitent dotted key")
             tgt[last] = val
@@ -85,20 +83,22 @@ def dedottify(json: dict[str, Any], recursive: bool = False) -> dict[str, Any]:
 
 
 def ijquery_keys(key: str) -> Iterator[str]:
-    start = 0
-    for m in ARG.finditer(key):
-        prev = key[start : m.start()]
-        if prev:
-            yield prev
-        yield m.group(1)
-        start = m.end()
-    prev = key[start:]
-    if prev:
-        yield prev
+    return iter(jquery_keys(key))
+
 
+@lru_cache(maxsize=4096)
+def jquery_keys(key: str) -> tuple[str, ...]:
+    # ARG.split alternates text between brackets (even indices, skipped
+    # when empty) with bracket contents (odd indices, always kept)
+    return tuple(k for i, k in enumerate(ARG.split(key)) if k or i & 1)
 
-def jquery_keys(key: str) -> list[str]:
-    return list(ijquery_keys(key))
+
+@lru_cache(maxsize=4096)
+def jquery_path(key: str) -> tuple[str | int, ...]:
+    """jquery_keys with list indices already parsed to ints: -1 is from a[]"""
+    return tuple(
+        -1 if k == "" else int(k) if k.isdigit() else k for k in jquery_keys(key)
+    )
 
 
 # names that are just [0] are invalid e.g.:
@@ -110,35 +110,35 @@ def jquery_json(form: MultiDict[str, Any]) -> dict[str, Any]:
     def ensure(lst: Any, idx: int) -> None:
         if not isinstance(lst, list):
             raise ValueError("inconsitent keys")
-        while len(lst) <= idx:
-            lst.append({})
+        n = idx + 1 - len(lst)
+        if n > 0:
+            # distinct placeholders: not [{}] * n
+            lst.extend([{} for _ in range(n)])
 
     for fullkey, val in form.items(multi=True):
-        keylist = jquery_keys(fullkey)
-        tgt = ret
-        prefix, key = keylist[:-1], keylist[-1]
-        if len(prefix) == 0 and key.isdigit():
+        path = jquery_path(fullkey)
+        last = len(path) - 1
+        if last < 0:  # empty field name
+            raise ValueError(f"illegal key {fullkey!r}")
+        if last == 0 and type(path[0]) is int and path[0] >= 0:
             raise ValueError(f"illegal key {fullkey}")
-        for k, nxt in zip(prefix, keylist[1:]):
-            if k == "":  # from a[]
-                k = str(len(tgt))
-            if k.isdigit():
-                i = int(k)
-                ensure(tgt, i)
-                tgt = tgt[i]  # type: ignore
-            else:
-                if k not in tgt:
-                    tgt[k] = [] if nxt.isdigit() or nxt == "" else {}
-                tgt = tgt[k]
-
-        if key == "":  # from a[]
-            key = str(len(tgt))
-        if key.isdigit():
-            i = int(key)
+        tgt = ret
+        # the terminal key is handled in the same loop as the prefix
+        for n, k in enumerate(path):
+            if isinstance(k, str):
+                if n == last:
+                    tgt[k] = val
+                else:
+                    if k not in tgt:
+                        tgt[k] = {} if type(path[n + 1]) is str else []
+                    tgt = tgt[k]
+                continue
+            i = len(tgt) if k < 0 else k
             ensure(tgt, i)
-            tgt[i] = val  # type: ignore
-        else:
-            tgt[key] = val
+            if n == last:
+                tgt[i] = val  # type: ignore
+            else:
+                tgt = tgt[i]  # type: ignore
     return ret
 
 
@@ -238,6 +238,7 @@ def read_text(package: str, resource: str) -> str:
     return resources.files(package).joinpath(resource).read_text(encoding="utf-8")
 
 
+@lru_cache(maxsize=None)
 def get_preamble() -> str:
     return read_text("flask_typescript", "preamble.d.ts")
     # path = Path(__file__).parent / "preamble.ts"
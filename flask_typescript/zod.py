@@ -5,9 +5,13 @@ from abc import abstractmethod
 from collections.abc import Sequence
 from dataclasses import dataclass
 from dataclasses import field
+from functools import lru_cache
 
 
 class ZOD(ABC):
+    # no instance __dict__ for slotted subclasses such as TSField
+    __slots__ = ()
+
     def __str__(self) -> str:
         return self.to_ts()
 
@@ -49,7 +53,7 @@ class ZOD(ABC):
         )
 
 
-@dataclass
+@dataclass(frozen=True)
 class StrZOD(ZOD):
     str_type: str
     generic: list[ZOD] = field(default_factory=list)
@@ -90,54 +94,69 @@ class GenericZOD(ZOD):
         )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TSField(ZOD):
     arg: ZOD
     name: str
     default: str | None = None
+    # rendered output for to_ts(astype=False) and to_ts(astype=True)
+    _ts: str | None = field(default=None, init=False, repr=False, compare=False)
+    _ts_type: str | None = field(default=None, init=False, repr=False, compare=False)
 
     def get_generic_args(self) -> list[ZOD]:
         return self.arg.get_generic_args()
 
     def to_ts(self, astype: bool = False) -> str:
-        args = self.arg.to_ts()
-        default = "" if self.default is None else f" /* ={self.default} */"
-        q = "?" if self.default is not None else ""
-        if astype:
-            return f"export type {self.name} = {args}{default}"
-        return f"{self.name}{q}: {args}{default}"
+        ret = self._ts_type if astype else self._ts
+        if ret is None:
+            args = self.arg.to_ts()
+            default = "" if self.default is None else f" /* ={self.default} */"
+            if astype:
+                ret = f"export type {self.name} = {args}{default}"
+                object.__setattr__(self, "_ts_type", ret)
+            else:
+                q = "?" if self.default is not None else ""
+                ret = f"{self.name}{q}: {args}{default}"
+                object.__setattr__(self, "_ts", ret)
+        return ret
 
     def anonymous(self) -> ZOD:
         return self.arg
 
 
+@lru_cache(maxsize=1024)
+def strzod(s: str) -> ZOD:
+    """Shared StrZOD for primitives and type names (they are never mutated)"""
+    return StrZOD(str_type=s)
+
+
 class BigZed:
     def any(self) -> ZOD:
-        return StrZOD(str_type="any")
+        return strzod("any")
 
     def void(self) -> ZOD:
-        return StrZOD(str_type="void")
+        return strzod("void")
 
     def null(self) -> ZOD:
-        return StrZOD(str_type="null")
+        return strzod("null")
 
     def string(self) -> ZOD:
-        return StrZOD(str_type="string")
+        return strzod("string")
 
     def number(self) -> ZOD:
-        return StrZOD(str_type="number")
+        return strzod("number")
 
     def boolean(self) -> ZOD:
-        return StrZOD(str_type="boolean")
+        return strzod("boolean")
 
     def File(self) -> ZOD:
-        return StrZOD(str_type="File")
+        return strzod("File")
 
     def unknown(self) -> ZOD:
-        return StrZOD(str_type="unknown")
+        return strzod("unknown")
 
     def ref(self, name: str) -> ZOD:
-        return StrZOD(str_type=name)
+        return strzod(name)
 
     def _generic(self, args: Sequence[ZOD]) -> list[ZOD]:
         return [g for i in args if i.is_generic for g in i.get_generic_args()]
@@ -152,19 +171,26 @@ class BigZed:
 
     def tuple(self, args: Sequence[ZOD]) -> ZOD:
         _args = list(args)
-        sargs = "[" + ",".join(i.to_ts() for i in _args) + "]"
+        sargs = "[" + ",".join([i.to_ts() for i in _args]) + "]"
         return StrZOD(str_type=sargs, generic=self._generic(_args))
 
     def union(self, args: list[ZOD]) -> ZOD:
-        null = self.null()
-        if null in args and args[-1] != null:
-            args.remove(null)
-            args = args + [null]
         # str|bytes => string|string => string
         # there is not ordered set...so we use an ordered dict
-        _args = {i.to_ts(): i for i in args}.keys()
+        # built in a single pass with "null" deferred to the end
+        _args: dict[str, None] = {}
+        null = False
+        for i in args:
+            ts = i.to_ts()
+            if ts == "null":
+                null = True
+            else:
+                _args[ts] = None
+        if null:
+            _args["null"] = None
 
         sargs = " | ".join(_args)
+        # null has no generic args so order doesn't matter here
         return StrZOD(str_type=sargs, generic=self._generic(args))
 
     def map(self, k: ZOD, v: ZOD) -> ZOD:
@@ -177,17 +203,17 @@ class BigZed:
 
     def object(self, fields: Sequence[TSField]) -> ZOD:
         _args = list(fields)
-        sfields = ", ".join(f.to_ts() for f in _args)
+        sfields = ", ".join([f.to_ts() for f in _args])
         sfields = "{ " + sfields + " }"
 
         return StrZOD(str_type=sfields, generic=self._generic(_args))
 
     def function(self, args: Sequence[TSField], returntype: ZOD) -> ZOD:
         _args = list(args)
-        sargs = ", ".join(f.to_ts() for f in _args)
+        sargs = ", ".join([f.to_ts() for f in _args])
         generic = self._generic(_args + [returntype])
         if generic:
-            val = ", ".join(g.to_generic_args() for g in generic)
+            val = ", ".join([g.to_generic_args() for g in generic])
             val = f"<{val}>"
         else:
             val = ""
@@ -24,6 +24,12 @@ class TestDecondig(unittest.TestCase):
 
         self.assertEqual(json, dict(a=["a", "b"]))
 
+    def test_JQueryFormEmptyKey(self):
+        """Test an empty field name is rejected"""
+        data = ImmutableMultiDict([("", "1")])
+        with self.assertRaises(ValueError):
+            jquery_form(data)
+
     def test_Unflatten(self):
         """Test unflatten"""
         data = ImmutableMultiDict([("a", "a"), ("a", "b"), ("a", "c")])
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy import text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import oracle
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.sqltypes import NativeForEmulated
+
+from flask_typescript.orm.orm import cache_path
+from flask_typescript.orm.orm import dc_handler
+from flask_typescript.orm.orm import get_metadata
+
+
+class TestDCHandler(unittest.TestCase):
+    def test_DialectTypes(self):
+        """Test dialect column types follow the SET, Enum, String ... order"""
+        for cls, expected in [
+            (NativeForEmulated, "_dc_any"),  # must not affect ENUM below
+            (postgresql.ENUM, "_dc_enum"),
+            (oracle.NUMBER, "_dc_integer"),  # Integer before Numeric
+            (mysql.VARCHAR, "_dc_string"),
+            (mysql.DOUBLE, "_dc_float"),
+            (mysql.SET, "_dc_set"),
+            (oracle.NUMBER, "_dc_integer"),  # memoized
+        ]:
+            with self.subTest(cls=cls.__name__):
+                self.assertEqual(dc_handler(cls).__name__, expected)
+
+
+class TestMetadataCache(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = str(Path(tmp.name) / "cache")
+        self.url = f"sqlite:///{Path(tmp.name) / 'test.db'}"
+        self.execute("CREATE TABLE a (id INTEGER PRIMARY KEY)")
+
+    def execute(self, sql: str) -> None:
+        engine = create_engine(self.url)
+        with engine.begin() as conn:
+            conn.execute(text(sql))
+        engine.dispose()
+
+    def tables(self, refresh: bool = False) -> set[str]:
+        meta = get_metadata(self.url, cache_dir=self.cache_dir, refresh=refresh)
+        return set(meta.tables)
+
+    def test_Cache(self):
+        """Test cache hit, refresh and that no temporary files are left"""
+        self.assertEqual(self.tables(), {"a"})
+        self.execute("CREATE TABLE b (id INTEGER PRIMARY KEY)")
+        self.assertEqual(self.tables(), {"a"})  # from the cache
+        self.assertEqual(self.tables(refresh=True), {"a", "b"})
+        self.assertEqual(self.tables(), {"a", "b"})
+        files = [p.name for p in Path(self.cache_dir).iterdir()]
+        self.assertEqual(files, [cache_path(self.cache_dir, self.url, ()).name])
+
+    def test_Corrupt(self):
+        """Test a truncated cache file is a cache miss"""
+        self.assertEqual(self.tables(), {"a"})
+        path = cache_path(self.cache_dir, self.url, ())
+        path.write_bytes(path.read_bytes()[:10])
+        self.execute("CREATE TABLE b (id INTEGER PRIMARY KEY)")
+        self.assertEqual(self.tables(), {"a", "b"})
+        self.assertEqual(self.tables(), {"a", "b"})  # rewritten
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import sys
 import unittest
+from dataclasses import dataclass
 from datetime import date  # noqa: F401
+from types import ModuleType
 from typing import Annotated
+from typing import ForwardRef
 from typing import Generic
 from typing import TypeVar
+from typing import Union
 
 from pydantic import BaseModel
 from pydantic import Field
@@ -71,6 +76,48 @@ class Parent(BaseModel):
     child: Child
 
 
+@dataclass
+class DCNode:
+    val: int
+    next: DCNode | None = None
+
+
+@dataclass
+class DCLeft:
+    right: DCRight | None = None
+
+
+@dataclass
+class DCRight:
+    left: DCLeft | None = None
+    child: Child | None = None
+
+
+@dataclass
+class DCHolder:
+    nodes: list[DCNode]
+    left: DCLeft
+
+
+@dataclass
+class DCPrimitive:
+    x: int
+    y: str = "y"
+
+
+@dataclass
+class DCNested:
+    prim: DCPrimitive
+    node: DCNode
+
+
+Thing = int  # target of the ForwardRef("Thing") test
+
+
+def in_this_module() -> None:
+    pass
+
+
 GenericFunc_expected = "export type GenericFunc<T= number | string> = (a: T, b: T) => T"
 
 
@@ -112,6 +159,11 @@ def get_models() -> dict[str, type[BaseModel]]:
     }
 
 
+def seen_names(builder: TSBuilder) -> list[str]:
+    """build everything referenced but not yet built"""
+    return sorted(t.name for t in (f() for f in builder.process_seen()) if t)
+
+
 def generate() -> None:
     Models = get_models()
     builder = TSBuilder()
@@ -158,6 +210,68 @@ class TestModels(unittest.TestCase):
         self.assertEqual({}, builder.seen)
         self.assertEqual(expect, str(b))
 
+    def test_Rebuild(self):
+        """Test building a dataclass again gives the same typescript and references"""
+        for typ in [DCNode, DCLeft, DCRight, DCHolder]:
+            with self.subTest(typ=typ.__name__):
+                warm, cold = TSBuilder(), TSBuilder()
+                for _ in range(2):
+                    cold.ts_cache.clear()
+                    cold.zod_cache.clear()
+                    self.assertEqual(str(warm(typ)), str(cold(typ)))
+                    self.assertEqual(warm.seen, cold.seen)
+                    self.assertEqual(seen_names(warm), seen_names(cold))
+                self.assertIn(id(typ), warm.ts_cache)
+
+    def test_ForwardRefModule(self):
+        """Test forward references resolve in the module being built"""
+        other = ModuleType("tests._forward_ref_module")
+        other.Thing = str
+
+        def in_other() -> None:
+            pass
+
+        in_other.__module__ = other.__name__
+        sys.modules[other.__name__] = other
+        self.addCleanup(sys.modules.pop, other.__name__)
+
+        builder = TSBuilder()
+        typ = list[ForwardRef("Thing")]
+        res = []
+        for func in [in_this_module, in_other, in_this_module]:
+            builder.build_stack.append(func)
+            try:
+                res.append(str(builder.type_to_zod(typ)))
+            finally:
+                builder.build_stack.pop()
+        self.assertEqual(res, ["number[]", "string[]", "number[]"])
+
+    def test_UnionOrder(self):
+        """Test equal unions keep their own order"""
+        builder = TSBuilder()
+        for typ, expected in [
+            (Union[int, str], "number | string"),
+            (Union[str, int], "string | number"),
+            (int | str, "number | string"),
+            (str | int, "string | number"),
+            (Union[int, str], "number | string"),
+        ]:
+            with self.subTest(typ=typ):
+                self.assertEqual(str(builder.type_to_zod(typ)), expected)
+
+    def test_AtomicRebuild(self):
+        """Test reusing a primitive-only dataclass built without use_name"""
+        warm, cold = TSBuilder(use_name=False), TSBuilder(use_name=False)
+        for typ in [DCPrimitive, DCNested, DCPrimitive, DCNested]:
+            with self.subTest(typ=typ.__name__):
+                cold.ts_cache.clear()
+                cold.zod_cache.clear()
+                self.assertEqual(str(warm(typ)), str(cold(typ)))
+                self.assertEqual(warm.built, cold.built)
+                self.assertEqual(warm.seen, cold.seen)
+        self.assertIn(id(DCPrimitive), warm.ts_cache)
+        self.assertNotIn(id(DCNested), warm.ts_cache)
+
 
 if __name__ == "__main__":
     generate()